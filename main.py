@@ -4,8 +4,6 @@ from pathlib import Path
 from src.generate import analyze
 from src import gentodo, generate
 from src.model.localization import I18nLanguage
-from src.translate import translate_file
-from src.translate.translator import create_translator
 import os
 
 i18n = [lang.value for lang in I18nLanguage]
@@ -38,6 +36,10 @@ def command_translate(args):
     And user also can translated by handmade
     """
     if args.file:
+        # Imported lazily, the LLM SDKs are slow to import and only this command needs them
+        from src.translate import translate_file, translate_files
+        from src.translate.translator import create_translator
+        
         # Get API credentials from arguments or environment variables
         api_key = args.api_key if hasattr(args, 'api_key') and args.api_key else os.environ.get("ANTHROPIC_API_KEY")
         base_url = args.base_url if hasattr(args, 'base_url') and args.base_url else os.environ.get("ANTHROPIC_BASE_URL")
@@ -53,18 +55,23 @@ def command_translate(args):
             provider=provider,
             api_key=api_key,
             base_url=base_url,
-            model_id=model_id
+            model_id=model_id,
+            budget_limit=args.budget if hasattr(args, 'budget') else None,
+            rpm=args.rpm if hasattr(args, 'rpm') else None,
+            tpm=args.tpm if hasattr(args, 'tpm') else None,
+            cache_enabled=False if getattr(args, 'no_cache', False) else None
         )
         
         limit = args.limit if hasattr(args, 'limit') and args.limit else None
+        concurrency = args.concurrency if hasattr(args, 'concurrency') and args.concurrency else 8
         
         # if file is directory
         if Path(args.file).is_dir():
-            for file in Path(args.file).glob("*.json"):
-                print(f"Translating file: {file}")
-                translate_file(translator, file, i18n_map.get(args.locale, I18nLanguage.ZH_CN), limit=limit)
+            batch = getattr(args, 'batch', False)
+            translate_files(translator, Path(args.file).glob("*.json"), i18n_map.get(args.locale, I18nLanguage.ZH_CN), limit=limit, concurrency=concurrency, batch=batch)
         else:
             translate_file(translator, Path(args.file), i18n_map.get(args.locale, I18nLanguage.ZH_CN), limit=limit)
+        print(f"API spend: ${translator.cost_tracker.total_cost():.4f} over {len(translator.cost_tracker.records)} requests")
     return 0
 
 def command_generate(args):
@@ -140,6 +147,12 @@ def main():
         type=int,
         help='Maximum number of items to translate (default: translate all untranslated items)'
     )
+    parser_translate.add_argument(
+        '--concurrency',
+        type=int,
+        default=8,
+        help='Maximum number of chunks translated at the same time when --file is a directory (default: 8)'
+    )
     parser_translate.add_argument(
         '--api-key',
         help='API key for the LLM service (default: read from ANTHROPIC_API_KEY env var)'
@@ -150,7 +163,7 @@ def main():
     )
     parser_translate.add_argument(
         '--model-id',
-        help='Model identifier to use (default: uses provider default model)'
+        help='Model identifier to use (default: uses provider default model, claude routes short prompts to Haiku)'
     )
     parser_translate.add_argument(
         '--provider',
@@ -158,6 +171,31 @@ def main():
         choices=['claude', 'deepseek', 'qwen'],
         help='LLM provider to use (default: claude)'
     )
+    parser_translate.add_argument(
+        '--batch',
+        action='store_true',
+        help='Submit all chunks as one provider batch job when --file is a directory, about half the cost but may take up to 24h'
+    )
+    parser_translate.add_argument(
+        '--budget',
+        type=float,
+        help='Stop translating once this many USD were spent on the API (default: unlimited)'
+    )
+    parser_translate.add_argument(
+        '--rpm',
+        type=int,
+        help='Requests per minute to stay under, 0 for unlimited (default: claude tier 1 limit of 50, unlimited for other providers)'
+    )
+    parser_translate.add_argument(
+        '--tpm',
+        type=int,
+        help='Input tokens per minute to stay under, 0 for unlimited (default: claude tier 1 limit of 30000, unlimited for other providers)'
+    )
+    parser_translate.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Neither reuse nor store cached translations and API responses, e.g. to redo translations cleared from data/*.json'
+    )
     parser_translate.set_defaults(func=command_translate)
     
     # generate
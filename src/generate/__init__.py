@@ -1,5 +1,6 @@
 import json
 from pathlib import Path
+from ..jsonio import intern_value, read_json, write_json
 
 def merge_translations(raw_file: Path, trans_file: Path, target_file: Path, locale: str, author: str = ""):
     """
@@ -18,8 +19,7 @@ def merge_translations(raw_file: Path, trans_file: Path, target_file: Path, loca
             print(f"Error: Raw file {raw_file} not found")
             return 1
             
-        with open(raw_file, 'r', encoding='utf-8') as f:
-            raw_texts = json.load(f)
+        raw_texts = read_json(raw_file)
             
         if not isinstance(raw_texts, list):
             print(f"Error: Raw file should contain a JSON array")
@@ -30,8 +30,7 @@ def merge_translations(raw_file: Path, trans_file: Path, target_file: Path, loca
             print(f"Error: Translation file {trans_file} not found") 
             return 1
             
-        with open(trans_file, 'r', encoding='utf-8') as f:
-            translations = json.load(f)
+        translations = read_json(trans_file)
             
         if not isinstance(translations, list):
             print(f"Error: Translation file should contain a JSON array")
@@ -44,58 +43,73 @@ def merge_translations(raw_file: Path, trans_file: Path, target_file: Path, loca
         existing_data = []
         if target_file.exists():
             try:
-                with open(target_file, 'r', encoding='utf-8') as f:
-                    existing_data = json.load(f)
+                existing_data = read_json(target_file)
                 if not isinstance(existing_data, list):
                     existing_data = []
             except json.JSONDecodeError:
                 print(f"Warning: Target file {target_file} contains invalid JSON, starting fresh")
                 existing_data = []
                 
-        # Create mapping of existing entries by raw text for quick lookup
-        existing_map = {}
-        for entry in existing_data:
-            if isinstance(entry, dict) and 'raw' in entry:
-                existing_map[entry['raw']] = entry
-                
+        # Create mapping of existing entries by raw text for quick lookup,
+        # interned so lookups with the same text hit the identity fast path
+        existing_map = {
+            intern_value(entry['raw']): entry
+            for entry in existing_data
+            if isinstance(entry, dict) and 'raw' in entry
+        }
+
+        # Pad missing translations once so the loop needs no bounds check
+        if len(translations) < len(raw_texts):
+            translations = translations + [""] * (len(raw_texts) - len(translations))
+
+        # Keep the first translation of each raw text so duplicates are merged once
+        seen = set()
+        pairs = []
+        for raw_text, translation in zip(raw_texts, translations):
+            raw_text = intern_value(raw_text)
+            if raw_text in seen:
+                continue
+            seen.add(raw_text)
+            pairs.append((raw_text, translation))
+        if len(pairs) != len(raw_texts):
+            print(f"Warning: Skipped {len(raw_texts) - len(pairs)} duplicate raw texts")
+
         # Process translation and merge
         updated_count = 0
         added_count = 0
         
-        for i, raw_text in enumerate(raw_texts):
-            translation = translations[i] if i < len(translations) else ""
-            
-            if raw_text in existing_map:
-                # Update existing entry
-                entry = existing_map[raw_text]
-                if 'translation' not in entry:
-                    entry['translation'] = {}
-                
-                # Update translation for this locale
-                entry['translation'][locale] = {
-                    'text': translation,
-                    'author': author
-                }
-                updated_count += 1
+        for raw_text, translation in pairs:
+            entry = existing_map.get(raw_text)
+            t = {
+                'text': translation,
+                'author': author
+            }
+            if entry is not None:
+                # Update translation for this locale, unless it is already identical
+                translation_map = entry.setdefault('translation', {})
+                if translation_map.get(locale) != t:
+                    translation_map[locale] = t
+                    updated_count += 1
             else:
                 # Create new entry
                 new_entry = {
                     'raw': raw_text,
                     'translation': {
-                        locale: {
-                            'text': translation,
-                            'author': author
-                        }
+                        locale: t
                     }
                 }
                 existing_data.append(new_entry)
                 existing_map[raw_text] = new_entry
                 added_count += 1
                 
+        if added_count == 0 and updated_count == 0:
+            # Nothing changed, skip rewriting the whole target file
+            print(f"No changes to merge, {target_file} is up to date")
+            return 0
+            
         # Write back to target file
         target_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(target_file, 'w', encoding='utf-8') as f:
-            json.dump(existing_data, f, ensure_ascii=False, indent=2)
+        write_json(target_file, existing_data)
             
         print(f"Merge completed:")
         print(f"  - Added {added_count} new entries")
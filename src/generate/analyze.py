@@ -1,48 +1,132 @@
-from typing import Set, Tuple
+from typing import Dict, List, Set, Tuple
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 import os
-import json
+import re
+import sys
+from ..jsonio import intern_value, read_json
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+
+if msgspec is not None:
+    class LocaleText(msgspec.Struct):
+        """Only the field progress counting reads, `author` is skipped while decoding"""
+        text: str = ""
+
+    class Entry(msgspec.Struct):
+        """Typed `data/*.json` item, decoded without building intermediate dicts"""
+        raw: str
+        translation: Dict[str, LocaleText] = {}
+
+    _ENTRY_LIST_DEC = msgspec.json.Decoder(List[Entry])
+    _STR_LIST_DEC = msgspec.json.Decoder(List[str])
+
+
+# Below this much input a process pool costs more to start than it saves
+_PARALLEL_MIN_BYTES = 32 * 1024 * 1024
+
+_SECTION_RE = re.compile(rb'^[^\n]*## translation progress[^\n]*(?:\n|\Z)', re.IGNORECASE | re.MULTILINE)
+_SECTION_END_RE = re.compile(rb'^[ \t\r]*---[ \t\r]*$', re.MULTILINE)
+
+
+def _is_str_list(content: bytes) -> bool:
+    """Peek at the first array element to tell a list of strings from a list of entries"""
+    return content.lstrip()[1:].lstrip()[:1] == b'"'
 
 
 def load_json_as_sets(file_path: Path, key = "raw") -> Set[str]:
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-        if not isinstance(data, list):
-            raise ValueError("Invalid `data` / `raw` json format")
-        res = set()
-        for item in data:
-            if isinstance(item, str):
-                res.add(item)
-            elif isinstance(item, dict):
-                res.add(item[key])
-        return res
+    if msgspec is not None and key == "raw":
+        content = Path(file_path).read_bytes()
+        try:
+            if _is_str_list(content):
+                return set(map(sys.intern, _STR_LIST_DEC.decode(content)))
+            return {sys.intern(e.raw) for e in _ENTRY_LIST_DEC.decode(content)}
+        except msgspec.ValidationError:
+            # Mixed lists or null fields, the loop below is more lenient
+            pass
+
+    data = read_json(file_path)
+    if not isinstance(data, list):
+        raise ValueError("Invalid `data` / `raw` json format")
+    res = set()
+    for item in data:
+        if isinstance(item, str):
+            res.add(intern_value(item))
+        elif isinstance(item, dict):
+            res.add(intern_value(item[key]))
+    return res
 
 def load_locale_count(file_path: Path, locale = "zh-CN") -> int:
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-        if not isinstance(data, list):
-            raise ValueError("Invalid locale json format")
-        count = 0
-        for item in data:
-            if not isinstance(item, dict):
-                continue
+    return _scan_output(file_path, locale)[1]
+
+def _scan_output(file_path: Path, locale = "zh-CN") -> Tuple[List[str], int]:
+    """
+    Collect raw strings and the translated count of an output file in a single decode
+    """
+    if msgspec is not None:
+        content = Path(file_path).read_bytes()
+        try:
+            if _is_str_list(content):
+                return list(map(sys.intern, _STR_LIST_DEC.decode(content))), 0
+            raws = []
+            count = 0
+            for e in _ENTRY_LIST_DEC.decode(content):
+                raws.append(sys.intern(e.raw))
+                loc = e.translation.get(locale)
+                if loc is not None and loc.text:
+                    count += 1
+            return raws, count
+        except msgspec.ValidationError:
+            # Mixed lists or null fields, the loop below is more lenient
+            pass
+
+    data = read_json(file_path)
+    if not isinstance(data, list):
+        raise ValueError("Invalid locale json format")
+    raws = []
+    count = 0
+    for item in data:
+        if isinstance(item, str):
+            raws.append(intern_value(item))
+        elif isinstance(item, dict):
+            raws.append(intern_value(item["raw"]))
             if locale in item["translation"] and item["translation"][locale]["text"]:
                 count += 1
-        return count
+    return raws, count
+
+def _scan_raw(file_path: Path) -> Set[str]:
+    return load_json_as_sets(file_path, "raw")
 
 def analyze_translation_progress(raw_dir: Path, output_dir: Path, locale: str = "zh-CN")-> Tuple[int, int]: 
-    raw_strings = set()
     # read raw_dir/*.json & output_dir/*_locale.json
-    for filename in os.listdir(raw_dir):
-        if filename.endswith(".json"):
-            file_path = os.path.join(raw_dir, filename)
-            raw_strings.update(load_json_as_sets(file_path, "raw"))
+    raw_files = [os.path.join(raw_dir, filename) for filename in os.listdir(raw_dir) if filename.endswith(".json")]
+    output_files = [os.path.join(output_dir, filename) for filename in os.listdir(output_dir) if filename.endswith(".json")]
+
+    # Decoding is CPU bound, fan files out over processes once there is enough
+    # data to amortize starting the pool
+    workers = min(len(raw_files) + len(output_files), os.cpu_count() or 1)
+    total_bytes = sum(os.path.getsize(f) for f in raw_files + output_files)
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 and total_bytes >= _PARALLEL_MIN_BYTES else None
+    map_files = executor.map if executor else map
+
+    raw_strings = set()
     translated_strings = 0
-    for filename in os.listdir(output_dir):
-        if filename.endswith(f".json"):
-            file_path = os.path.join(output_dir, filename)
-            raw_strings.update(load_json_as_sets(file_path, "raw"))
-            translated_strings += load_locale_count(file_path, locale)
+    try:
+        raw_results = map_files(_scan_raw, raw_files)
+        # raws and translated count come from the same decode
+        output_results = map_files(_scan_output, output_files, [locale] * len(output_files))
+        for raws in raw_results:
+            raw_strings.update(raws)
+        for raws, count in output_results:
+            raw_strings.update(raws)
+            translated_strings += count
+    finally:
+        if executor:
+            executor.shutdown()
 
     total = len(raw_strings)
     translated = translated_strings
@@ -62,65 +146,42 @@ def write_translation_progress(readme_file: Path, total: int, translated: int, l
     badge_url = f"![translation {locale}](https://img.shields.io/badge/translation_{sheilds_locale}-{translated}%2F{total}-blue)"
 
     try:
-        with open(readme_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+        content = readme_file.read_bytes()
     except FileNotFoundError:
         # 如果README.md不存在，创建一个基本的结构
-        lines = [
-            "# translation\n",
-            "\n",
-            "---\n",
-            "\n", 
-            "## translation progress\n",
-            "\n",
-            "---\n"
-        ]
+        content = b"# translation\n\n---\n\n## translation progress\n\n---\n"
     
-    # 查找translation progress section
-    start_idx = None
-    end_idx = None
+    # 保持文件原有的换行符
+    eol = b"\r\n" if b"\r\n" in content else b"\n"
+    badge = badge_url.encode('utf-8')
     
-    for i, line in enumerate(lines):
-        if "## translation progress" in line.lower():
-            start_idx = i
-        elif start_idx is not None and line.strip() == "---":
-            end_idx = i
-            break
+    # 查找translation progress section
+    section = _SECTION_RE.search(content)
     
-    if start_idx is None:
+    if section is None:
         # 如果没有找到translation progress section，在文件末尾添加
-        lines.extend([
-            "\n",
-            "## translation progress\n",
-            "\n",
-            f"{badge_url}\n",
-            "\n",
-            "---\n"
-        ])
+        content += eol + b"## translation progress" + eol + eol + badge + eol + eol + b"---" + eol
     else:
-        # 在translation progress section中查找现有的badge
-        locale_found = False
-        badge_pattern = f"translation_{sheilds_locale}"
+        start = section.end()
+        end = _SECTION_END_RE.search(content, start)
+        stop = end.start() if end else len(content)
         
-        # 搜索现有的locale badge并替换
-        for i in range(start_idx + 1, end_idx if end_idx else len(lines)):
-            if badge_pattern in lines[i]:
-                lines[i] = f"{badge_url}\n"
-                locale_found = True
-                break
+        # 在translation progress section中查找现有的badge并替换
+        badge_re = re.compile(rb'^[^\n]*' + re.escape(f"translation_{sheilds_locale}".encode('utf-8')) + rb'[^\n]*\n?', re.MULTILINE)
+        found = badge_re.search(content, start, stop)
         
-        # 如果没有找到现有的locale badge，添加新的
-        if not locale_found:
-            if end_idx is not None:
-                # 在 --- 之前插入新的badge
-                lines.insert(end_idx, f"{badge_url}\n")
-            else:
-                # 如果没有结束标记，在section末尾添加
-                lines.append(f"{badge_url}\n")
-                lines.append("---\n")
+        if found:
+            content = content[:found.start()] + badge + eol + content[found.end():]
+        elif end is not None:
+            # 在 --- 之前插入新的badge
+            content = content[:stop] + badge + eol + content[stop:]
+        else:
+            # 如果没有结束标记，在section末尾添加
+            if content and not content.endswith(b"\n"):
+                content += eol
+            content += badge + eol + b"---" + eol
     
-    # 写回文件
-    with open(readme_file, 'w', encoding='utf-8') as f:
-        f.writelines(lines)
+    # 一次性写回文件
+    readme_file.write_bytes(content)
     
     print(f"Update {locale} translation progress: {translated}/{total} ({translated/total*100:.1f}%)")
@@ -2,53 +2,67 @@
 import json
 import re
 from pathlib import Path
+from ..jsonio import read_json, read_json_mapped, write_json
+
+_JP_RE = re.compile(r'[\u3040-\u309f\u30a0-\u30ff\u4e00-\u9faf\uff00-\uffef]')
+_UNI_RE = re.compile(r'\\u([0-9a-fA-F]{4})')
+
+
+def _replace_unicode(match):
+    try:
+        code = int(match.group(1), 16)
+        return chr(code)
+    except (ValueError, OverflowError):
+        return match.group(0)  # Return original if can't decode
+
+
+def decode_unicode_escapes(text):
+    """Safely decode Unicode escape sequences in text"""
+    # Most strings carry no escapes, a substring check is far cheaper than sub()
+    if '\\u' not in text:
+        return text
+    # Handle \uXXXX patterns
+    return _UNI_RE.sub(_replace_unicode, text)
+
 
 def extract_japanese_texts(data):
     """
     Extract Japanese text from JSON data
     Converts Unicode escape sequences to UTF-8 and filters for Japanese characters
+    Returns unique texts in order of first appearance
     """
-    import re
-    
     japanese_texts = []
-    
-    def decode_unicode_escapes(text):
-        """Safely decode Unicode escape sequences in text"""
-        def replace_unicode(match):
-            try:
-                code = int(match.group(1), 16)
-                return chr(code)
-            except (ValueError, OverflowError):
-                return match.group(0)  # Return original if can't decode
-        
-        # Handle \uXXXX patterns
-        unicode_pattern = re.compile(r'\\u([0-9a-fA-F]{4})')
-        return unicode_pattern.sub(replace_unicode, text)
-    
-    def process_item(item):
+    seen = set()
+
+    def collect(text):
+        # Plain ASCII without escapes can never be Japanese, reject it before
+        # paying for the decode, the set lookup and the regex
+        if text.isascii() and '\\u' not in text:
+            return
+        # Convert Unicode escape sequences to actual characters
+        decoded_text = decode_unicode_escapes(text)
+        # Check if text contains Japanese characters
+        if decoded_text not in seen and is_japanese_text(decoded_text):
+            seen.add(decoded_text)
+            japanese_texts.append(decoded_text)
+
+    # Walk the tree with an explicit stack instead of recursion, pushing
+    # children in reverse so they are visited in document order
+    stack = [data]
+    while stack:
+        item = stack.pop()
         if isinstance(item, dict):
             # Look for 'value' field in dictionary items
-            if 'value' in item:
-                text = item['value']
-                if isinstance(text, str) and text.strip():
-                    # Convert Unicode escape sequences to actual characters
-                    decoded_text = decode_unicode_escapes(text)
-                    # Check if text contains Japanese characters
-                    if is_japanese_text(decoded_text):
-                        japanese_texts.append(decoded_text)
-            # Recursively process other values
-            for value in item.values():
-                process_item(value)
+            text = item.get('value')
+            if isinstance(text, str) and text.strip():
+                collect(text)
+            stack.extend(reversed(item.values()))
         elif isinstance(item, list):
-            for element in item:
-                process_item(element)
+            stack.extend(reversed(item))
         elif isinstance(item, str) and item.strip():
             # Process string directly
-            decoded_text = decode_unicode_escapes(item)
-            if is_japanese_text(decoded_text):
-                japanese_texts.append(decoded_text)
-    
-    process_item(data)
+            collect(item)
+
     return japanese_texts
 
 
@@ -56,28 +70,18 @@ def is_japanese_text(text):
     """
     Check if text contains Japanese characters (Hiragana, Katakana, Kanji)
     检查文本是否包含日文字符（平假名、片假名、汉字）
+
+    Japanese Unicode ranges:
+    Hiragana: U+3040-U+309F
+    Katakana: U+30A0-U+30FF
+    CJK Unified Ideographs (Kanji): U+4E00-U+9FAF
+    Full-width characters: U+FF00-U+FFEF
     """
-    if not text:
+    # str.isascii() is O(1) in CPython (it reads a flag on the string object),
+    # which rejects the ids/keys that make up most of a raw dump without a scan
+    if not text or text.isascii():
         return False
-    
-    # Japanese Unicode ranges:
-    # Hiragana: U+3040-U+309F
-    # Katakana: U+30A0-U+30FF
-    # CJK Unified Ideographs (Kanji): U+4E00-U+9FAF
-    # Full-width characters: U+FF00-U+FFEF
-    japanese_ranges = [
-        (0x3040, 0x309F),  # Hiragana
-        (0x30A0, 0x30FF),  # Katakana
-        (0x4E00, 0x9FAF),  # CJK Unified Ideographs (Kanji)
-        (0xFF00, 0xFFEF),  # Full-width forms
-    ]
-    
-    for char in text:
-        char_code = ord(char)
-        for start, end in japanese_ranges:
-            if start <= char_code <= end:
-                return True
-    return False
+    return _JP_RE.search(text) is not None
 
 def gen(input_file: Path, output_dir: Path):
     if not input_file.exists():
@@ -85,17 +89,12 @@ def gen(input_file: Path, output_dir: Path):
         return 1
     
     try:
-        # Read input JSON file
-        with open(input_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Extract Japanese text from the data
-        japanese_texts = extract_japanese_texts(data)
+        # Read input JSON file, raw dumps can be hundreds of MB so parse from a memory map
+        data = read_json_mapped(input_file)
         
-        # Remove duplicates while preserving order
-        unique_texts = list(dict.fromkeys(japanese_texts))
+        # Extract unique Japanese text from the data, in order of first appearance
+        unique_texts = extract_japanese_texts(data)
         
-        print(f"Found {len(japanese_texts)} total Japanese texts")
         print(f"Found {len(unique_texts)} unique Japanese texts")
         
         # Check and update OUTPUT_DIR (data directory)
@@ -126,11 +125,10 @@ def _update_output_dir_file(output_path: Path, new_texts: list):
         
         # Read existing file if it exists
         if output_path.exists():
-            with open(output_path, 'r', encoding='utf-8') as f:
-                existing_data = json.load(f)
-                if isinstance(existing_data, list):
-                    existing_texts = existing_data
-                print(f"Found existing file with {len(existing_texts)} entries: {output_path}")
+            existing_data = read_json(output_path)
+            if isinstance(existing_data, list):
+                existing_texts = existing_data
+            print(f"Found existing file with {len(existing_texts)} entries: {output_path}")
         
         # Extract existing text strings for comparison
         # Handle both formats: simple strings and dict objects with "raw" field
@@ -159,8 +157,7 @@ def _update_output_dir_file(output_path: Path, new_texts: list):
             
             # Write updated content back to file
             output_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(updated_texts, f, ensure_ascii=False, indent=2)
+            write_json(output_path, updated_texts)
             
             print(f"Updated {output_path}: added {len(new_unique_texts)} new entries")
             print(f"Total entries in file: {len(updated_texts)}")
@@ -178,8 +175,7 @@ def _update_output_dir_file(output_path: Path, new_texts: list):
             })
         
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(new_objects, f, ensure_ascii=False, indent=2)
+        write_json(output_path, new_objects)
         print(f"Created new file due to read error: {output_path}")
     except Exception as e:
         print(f"Error updating output file {output_path}: {e}")
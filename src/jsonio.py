@@ -0,0 +1,97 @@
+"""
+JSON file helpers shared by gentodo / translate / generate
+
+Uses orjson when it is installed and falls back to the stdlib json module.
+Both paths write UTF-8 without ASCII escaping and with 2-space indentation.
+"""
+import json
+import mmap
+import os
+import sys
+from pathlib import Path
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+PathLike = Union[str, Path]
+
+
+def read_json(path: PathLike) -> Any:
+    """
+    Read and parse a JSON file
+
+    Raises:
+        json.JSONDecodeError: If the file is not valid JSON
+            (orjson.JSONDecodeError is a subclass of it)
+    """
+    # Read the whole file in one go and let the parser decode the UTF-8
+    # bytes itself instead of going through a buffered text wrapper
+    content = Path(path).read_bytes()
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def read_json_mapped(path: PathLike) -> Any:
+    """
+    Parse a large JSON file straight from a read-only memory map
+
+    orjson accepts a memoryview, so the file is never copied into an
+    intermediate bytes object. Falls back to read_json without orjson.
+    """
+    if orjson is None:
+        return read_json(path)
+    with open(path, 'rb') as f:
+        if Path(path).stat().st_size == 0:
+            # mmap can't map an empty file, let the parser report it
+            return orjson.loads(b"")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
+
+
+def write_json(path: PathLike, obj: Any) -> None:
+    """
+    Serialize obj as indented UTF-8 JSON into path
+
+    The content is written to a temporary sibling file which then atomically
+    replaces path, so an interrupted write never leaves a truncated file behind.
+    """
+    if orjson is not None:
+        content = orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    else:
+        content = json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    try:
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Parse a JSON document held in memory, e.g. an HTTP response body
+
+    Raises:
+        json.JSONDecodeError: If data is not valid JSON
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize obj as compact UTF-8 JSON, e.g. for an HTTP request body"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def intern_value(value: Any) -> Any:
+    """Intern a decoded JSON string, other values (numbers, null) are returned unchanged"""
+    return sys.intern(value) if isinstance(value, str) else value
@@ -4,8 +4,12 @@ import src.translate.prompt.zh_cn as zh_cn
 import src.translate.prompt.en as en
 from src.translate.prompt import get_reference_prompt
 from src.translate.translator import LLMTranslator
+from src.translate import cache
+from src.translate.cost import BudgetExceeded
+from src.jsonio import read_json, write_json
+import asyncio
 import json
-from typing import List, Iterator
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 
 prompt_module_map = {
@@ -29,22 +33,11 @@ def translate_file(translator: LLMTranslator, file: Path, target_language: I18nL
         raise ValueError(f"No translation prompt module found for {target_language.value}")
     
     # Read the input file
-    with open(file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = read_json(file)
     
     # Filter out texts that are already translated for the target locale
     locale_key = target_language.value
-    untranslated_items = []
-    
-    for item in data:
-        if (isinstance(item, dict) and 
-            "raw" in item and 
-            "translation" in item):
-            
-            # Check if translation exists and is not empty
-            if (locale_key not in item["translation"] or 
-                not item["translation"][locale_key].get("text", "").strip()):
-                untranslated_items.append(item)
+    untranslated_items = _collect_untranslated(data, locale_key)
     
     if not untranslated_items:
         print(f"All texts are already translated for {target_language.value}")
@@ -52,6 +45,13 @@ def translate_file(translator: LLMTranslator, file: Path, target_language: I18nL
     
     print(f"Found {len(untranslated_items)} untranslated items for {target_language.value}")
     
+    # Fill in translations the translator's models already produced before calling the API
+    untranslated_items = _apply_cached(untranslated_items, locale_key, _cache_models(translator))
+    if not untranslated_items:
+        write_json(file, data)
+        print("All remaining texts were served from the translation cache")
+        return
+    
     # Apply limit if specified
     if limit is not None and limit > 0:
         original_count = len(untranslated_items)
@@ -61,6 +61,7 @@ def translate_file(translator: LLMTranslator, file: Path, target_language: I18nL
     # Get base prompt and reference examples
     base_prompt = prompt_module.prompt
     translate_reference = get_reference_prompt(file, target_language, 24)
+    system_prompt = _build_system_prompt(base_prompt, translate_reference)
 
     
     # Process texts in chunks
@@ -71,49 +72,18 @@ def translate_file(translator: LLMTranslator, file: Path, target_language: I18nL
         raw_texts = [item["raw"] for item in chunk]
         
         # Create prompt for this chunk
-        texts_array_str = json.dumps(raw_texts, ensure_ascii=False, indent=2)
-        
-        full_prompt = f"""{base_prompt}
-
-## Translation Reference Examples:
-You must refer to these examples for translation style and tone.
-
-{translate_reference}
-
-## Original Texts to Translate:
-{texts_array_str}
-
-## Output Format:
-Return ONLY a JSON array of translated texts in the same order as the original array.
-Do not include any explanatory text!!!
-Do not return markdown code format!!!
-Do not return markdown code like ```json...```
-just return json string
-Example format: ["translated text 1", "translated text 2", ...]
-"""
-        
-        # print(f"Prompt for chunk {chunk_idx + 1}:")
-        # print("=" * 50)
-        # print(full_prompt)
-        # print("=" * 50)
+        prompt = _build_prompt(raw_texts)
         
         # Call translation API using the translator
-        response = translator.translate(full_prompt, target_lang=target_language.value)
-        
-        # remove markdown code block if exists
-        if response.startswith("```") and response.endswith("```"):
-            response = "\n".join(response.split("\n")[1:-1])
+        author = translator.model_for(prompt, len(raw_texts), system=system_prompt)
+        response = translator.translate(prompt, target_lang=target_language.value, item_count=len(raw_texts), system=system_prompt)
         
         try:
             # Parse JSON response to get translated texts array
-            translated_texts = json.loads(response.strip())
-            
-            if not isinstance(translated_texts, list):
-                print(f"Warning: API response is not a list for chunk {chunk_idx + 1}")
-                continue
-                
-            if len(translated_texts) != len(raw_texts):
-                print(f"Warning: Translation count mismatch for chunk {chunk_idx + 1}. Expected {len(raw_texts)}, got {len(translated_texts)}")
+            translated_texts = _parse_response(response, len(raw_texts), chunk_idx + 1)
+            if translated_texts is None:
+                # Don't let reruns replay the unusable reply from the response cache
+                translator.discard_response(prompt, target_lang=target_language.value, item_count=len(raw_texts), system=system_prompt)
                 continue
             
             # Update the untranslated items with translations
@@ -125,22 +95,20 @@ Example format: ["translated text 1", "translated text 2", ...]
                     
                     # Fill in the translation
                     item["translation"][locale_key]["text"] = translated_texts[i]
-                    item["translation"][locale_key]["author"] = translator.model_id
+                    item["translation"][locale_key]["author"] = author
+            
+            if translator.cache_enabled:
+                cache.put_many(zip(raw_texts, translated_texts), locale_key, author)
             
             # Write updated data back to file after each chunk
             try:
-                with open(file, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
+                write_json(file, data)
                 print(f"Successfully translated and saved {len(translated_texts)} items in chunk {chunk_idx + 1}")
             except Exception as e:
                 print(f"Error writing file after chunk {chunk_idx + 1}: {e}")
                 # Continue processing other chunks even if one write fails
                 continue
             
-        except json.JSONDecodeError as e:
-            print(f"Error parsing JSON response for chunk {chunk_idx + 1}: {e}")
-            print(f"Response content: \n{response}")
-            continue
         except Exception as e:
             print(f"Error processing chunk {chunk_idx + 1}: {e}")
             continue
@@ -149,6 +117,285 @@ Example format: ["translated text 1", "translated text 2", ...]
     print(f"Total chunks processed: {chunk_idx + 1}")
 
 
+def translate_files(translator: LLMTranslator, files: Iterable[Path], target_language: I18nLanguage, chunk_size: int = 24, limit: int = None, concurrency: int = 8, batch: bool = False) -> None:
+    """
+    Translate several files, sending every distinct raw text to the API only once.
+    
+    Untranslated items of all files are grouped by raw text. The unique texts are
+    translated in chunks that run concurrently through the translator's async API
+    (bounded by an asyncio semaphore), and each result is scattered back to every
+    item sharing that raw text before the touched files are saved.
+    
+    With batch=True all chunks are instead submitted as one provider batch job,
+    which is cheaper but may take hours to finish.
+    
+    Args:
+        translator: LLM translator instance
+        files: Paths to the input files
+        target_language: Target language for translation
+        chunk_size: Number of texts to process in each chunk (default: 24)
+        limit: Maximum number of unique texts to translate (default: None, translate all)
+        concurrency: Maximum number of chunks translated at the same time (default: 8)
+        batch: Submit the chunks through the provider's batch API (default: False)
+    """
+    prompt_module = prompt_module_map.get(target_language)
+    if not prompt_module:
+        raise ValueError(f"No translation prompt module found for {target_language.value}")
+    
+    files = list(files)
+    locale_key = target_language.value
+    data_by_file = {file: read_json(file) for file in files}
+    
+    # raw text -> every (file, item) waiting for its translation
+    unique: Dict[str, List[Tuple[Path, dict]]] = {}
+    for file, data in data_by_file.items():
+        for item in _collect_untranslated(data, locale_key):
+            unique.setdefault(item["raw"], []).append((file, item))
+    
+    if not unique:
+        print(f"All texts are already translated for {target_language.value}")
+        return
+    
+    item_count = sum(len(targets) for targets in unique.values())
+    print(f"Found {item_count} untranslated items ({len(unique)} unique texts) for {target_language.value} in {len(files)} files")
+    
+    # Fill in translations the translator's models already produced before calling the API
+    models = _cache_models(translator)
+    pending = []
+    dirty = set()
+    for raw, targets in unique.items():
+        cached = _cached_translation(raw, locale_key, models)
+        if cached is None:
+            pending.append(raw)
+        else:
+            text, model = cached
+            dirty.update(_scatter(targets, locale_key, text, model))
+    if dirty:
+        print(f"Filled {len(unique) - len(pending)} unique texts from the translation cache")
+        for file in dirty:
+            write_json(file, data_by_file[file])
+    if not pending:
+        print("All remaining texts were served from the translation cache")
+        return
+    
+    # Apply limit if specified
+    if limit is not None and limit > 0:
+        original_count = len(pending)
+        pending = pending[:limit]
+        print(f"Limited to {len(pending)} unique texts (original: {original_count})")
+    
+    base_prompt = prompt_module.prompt
+    translate_reference = get_reference_prompt(files, target_language, 24)
+    system_prompt = _build_system_prompt(base_prompt, translate_reference)
+    
+    chunks = list(_chunk_items(pending, chunk_size))
+    
+    def _save_chunk(chunk_no: int, raw_texts: List[str], response: str, author: str) -> None:
+        translated_texts = _parse_response(response, len(raw_texts), chunk_no)
+        if translated_texts is None:
+            # Don't let reruns replay the unusable reply from the response cache
+            translator.discard_response(_build_prompt(raw_texts), target_lang=target_language.value, item_count=len(raw_texts), system=system_prompt)
+            return
+        if translator.cache_enabled:
+            cache.put_many(zip(raw_texts, translated_texts), locale_key, author)
+        touched = set()
+        for raw, text in zip(raw_texts, translated_texts):
+            touched.update(_scatter(unique[raw], locale_key, text, author))
+        for file in touched:
+            write_json(file, data_by_file[file])
+        print(f"Successfully translated {len(translated_texts)} unique texts in chunk {chunk_no}, saved {len(touched)} files")
+    
+    if batch:
+        prompts = [_build_prompt(raw_texts) for raw_texts in chunks]
+        item_counts = [len(raw_texts) for raw_texts in chunks]
+        print(f"Submitting {len(chunks)} chunks as a batch job...")
+        try:
+            responses = translator.translate_batch_job(prompts, target_lang=target_language.value, item_counts=item_counts, system=system_prompt)
+        except BudgetExceeded as e:
+            print(f"Batch job not submitted: {e}")
+            return
+        for chunk_idx, (raw_texts, prompt, response) in enumerate(zip(chunks, prompts, responses)):
+            if response is None:
+                print(f"Error processing chunk {chunk_idx + 1}: no result in the batch job")
+                continue
+            try:
+                _save_chunk(chunk_idx + 1, raw_texts, response, translator.model_for(prompt, len(raw_texts), system=system_prompt))
+            except Exception as e:
+                print(f"Error processing chunk {chunk_idx + 1}: {e}")
+        print(f"Translation process completed for {len(files)} files")
+        return
+    
+    async def _translate_all() -> None:
+        sem = asyncio.Semaphore(max(1, concurrency))
+        
+        async def _translate_one(chunk_no: int, raw_texts: List[str]) -> None:
+            prompt = _build_prompt(raw_texts)
+            author = translator.model_for(prompt, len(raw_texts), system=system_prompt)
+            try:
+                async with sem:
+                    print(f"Processing chunk {chunk_no} with {len(raw_texts)} items...")
+                    response = await translator.atranslate(prompt, target_lang=target_language.value, item_count=len(raw_texts), system=system_prompt)
+                # Runs on the event loop thread, so file writes never race each other
+                _save_chunk(chunk_no, raw_texts, response, author)
+            except Exception as e:
+                print(f"Error processing chunk {chunk_no}: {e}")
+        
+        try:
+            await asyncio.gather(*(
+                _translate_one(chunk_idx + 1, raw_texts)
+                for chunk_idx, raw_texts in enumerate(chunks)
+            ))
+        finally:
+            await translator.aclose()
+    
+    asyncio.run(_translate_all())
+    print(f"Translation process completed for {len(files)} files")
+
+
+def _collect_untranslated(data: list, locale_key: str) -> List[dict]:
+    """
+    Return the items that have no translation for the locale yet.
+    """
+    untranslated_items = []
+    for item in data:
+        if (isinstance(item, dict) and 
+            "raw" in item and 
+            "translation" in item):
+            
+            # Check if translation exists and is not empty
+            if (locale_key not in item["translation"] or 
+                not item["translation"][locale_key].get("text", "").strip()):
+                untranslated_items.append(item)
+    return untranslated_items
+
+
+def _build_system_prompt(base_prompt: str, translate_reference: str) -> str:
+    """
+    Build the instructions shared by every chunk.
+    
+    Kept apart from the raw texts so providers can cache this prefix across requests.
+    """
+    return f"""{base_prompt}
+
+## Translation Reference Examples:
+You must refer to these examples for translation style and tone.
+
+{translate_reference}
+
+## Output Format:
+Return ONLY a JSON array of translated texts in the same order as the original array.
+Do not include any explanatory text!!!
+Do not return markdown code format!!!
+Do not return markdown code like ```json...```
+just return json string
+Example format: ["translated text 1", "translated text 2", ...]
+"""
+
+
+def _build_prompt(raw_texts: List[str]) -> str:
+    """
+    Build the per-chunk prompt holding the raw texts.
+    """
+    texts_array_str = json.dumps(raw_texts, ensure_ascii=False, indent=2)
+    
+    return f"""## Original Texts to Translate:
+{texts_array_str}
+"""
+
+
+def _parse_response(response: str, expected: int, chunk_no: int) -> Optional[List[str]]:
+    """
+    Parse the JSON array returned for a chunk.
+    
+    Returns:
+        The translated texts, or None if the response is unusable
+    """
+    # remove markdown code block if exists
+    if response.startswith("```") and response.endswith("```"):
+        response = "\n".join(response.split("\n")[1:-1])
+    
+    try:
+        translated_texts = json.loads(response.strip())
+    except json.JSONDecodeError as e:
+        print(f"Error parsing JSON response for chunk {chunk_no}: {e}")
+        print(f"Response content: \n{response}")
+        return None
+    
+    if not isinstance(translated_texts, list):
+        print(f"Warning: API response is not a list for chunk {chunk_no}")
+        return None
+    
+    if len(translated_texts) != expected:
+        print(f"Warning: Translation count mismatch for chunk {chunk_no}. Expected {expected}, got {len(translated_texts)}")
+        return None
+    
+    return translated_texts
+
+
+def _scatter(targets: List[Tuple[Path, dict]], locale_key: str, text: str, author: str) -> Set[Path]:
+    """
+    Write one translation into every item sharing a raw text.
+    
+    Returns:
+        The files whose data changed
+    """
+    for _, item in targets:
+        item["translation"][locale_key] = {
+            "text": text,
+            "author": author
+        }
+    return {file for file, _ in targets}
+
+
+def _cache_models(translator: LLMTranslator) -> List[str]:
+    """
+    Models whose cached translations may be reused.
+    
+    Empty when the translator has caching disabled, i.e. for providers that sample
+    at a high temperature or with --no-cache, so every item is requested again.
+    """
+    return translator.models() if translator.cache_enabled else []
+
+
+def _cached_translation(raw: str, locale_key: str, models: List[str]) -> Optional[Tuple[str, str]]:
+    """
+    Look a raw text up in the persistent translation cache.
+    
+    Args:
+        models: Models whose translations are acceptable, in order of preference
+    
+    Returns:
+        The cached text and the model that produced it, or None on a miss
+    """
+    for model in models:
+        text = cache.get(raw, locale_key, model)
+        if text is not None:
+            return text, model
+    return None
+
+
+def _apply_cached(items: List[dict], locale_key: str, models: List[str]) -> List[dict]:
+    """
+    Fill items from the persistent translation cache.
+    
+    Returns:
+        Items that are still untranslated after the cache lookup
+    """
+    pending = []
+    for item in items:
+        cached = _cached_translation(item["raw"], locale_key, models)
+        if cached is None:
+            pending.append(item)
+            continue
+        text, model = cached
+        item["translation"][locale_key] = {
+            "text": text,
+            "author": model
+        }
+    if len(pending) != len(items):
+        print(f"Filled {len(items) - len(pending)} items from the translation cache")
+    return pending
+
 
 def _chunk_items(items: List[dict], chunk_size: int) -> Iterator[List[dict]]:
     """
@@ -0,0 +1,106 @@
+"""
+Persistent translation cache
+
+Exact-match cache of LLM translations keyed by (raw text, locale, model id).
+Entries live in a SQLite database so reruns and retries after partial failures
+skip strings that were already translated by the same model.
+
+The same database also holds whole API responses keyed by a hash of the request
+(see LLMTranslator), so repeating an identical prompt costs no API call.
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+CACHE_FILE = Path(".cache") / "translations.sqlite3"
+
+_local = threading.local()
+
+
+def _hash(raw: str, locale: str, model: str) -> str:
+    return hashlib.sha1(f"{raw}\0{locale}\0{model}".encode("utf-8")).hexdigest()
+
+
+def _connect() -> sqlite3.Connection:
+    """Return the calling thread's connection, sqlite3 connections can't be shared across threads"""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(CACHE_FILE)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS translations (hash TEXT PRIMARY KEY, text TEXT NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, text TEXT NOT NULL, created REAL NOT NULL)")
+        _local.conn = conn
+    return conn
+
+
+def get(raw: str, locale: str, model: str) -> Optional[str]:
+    """
+    Look up a cached translation
+
+    Returns:
+        The cached text, or None on a miss (blank entries count as a miss)
+    """
+    row = _connect().execute(
+        "SELECT text FROM translations WHERE hash = ?", (_hash(raw, locale, model),)
+    ).fetchone()
+    return row[0] if row and row[0].strip() else None
+
+
+def put(raw: str, locale: str, model: str, text: str) -> None:
+    """Store a translation"""
+    put_many([(raw, text)], locale, model)
+
+
+def put_many(pairs: Iterable[Tuple[str, str]], locale: str, model: str) -> None:
+    """
+    Store several (raw, text) translations in one transaction
+
+    Blank texts are skipped, the items stay untranslated and get requested again
+    """
+    conn = _connect()
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO translations (hash, text) VALUES (?, ?)",
+            [(_hash(raw, locale, model), text) for raw, text in pairs if isinstance(text, str) and text.strip()],
+        )
+
+
+def get_response(key: str, ttl: Optional[float] = None) -> Optional[str]:
+    """
+    Look up a cached API response
+
+    Args:
+        key: Request hash
+        ttl: Ignore entries older than this many seconds (default: None, never expire)
+
+    Returns:
+        The cached response, or None on a miss
+    """
+    row = _connect().execute(
+        "SELECT text, created FROM responses WHERE key = ?", (key,)
+    ).fetchone()
+    if row is None or (ttl is not None and time.time() - row[1] > ttl):
+        return None
+    return row[0]
+
+
+def put_response(key: str, text: str) -> None:
+    """Store an API response"""
+    conn = _connect()
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (key, text, created) VALUES (?, ?, ?)",
+            (key, text, time.time()),
+        )
+
+
+def delete_response(key: str) -> None:
+    """Remove an API response, e.g. one the caller couldn't use"""
+    conn = _connect()
+    with conn:
+        conn.execute("DELETE FROM responses WHERE key = ?", (key,))
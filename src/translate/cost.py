@@ -0,0 +1,110 @@
+"""
+API spend tracking
+
+Every API response's token usage becomes an immutable CostRecord. A
+CostTracker holds the records of one translator and refuses further requests
+once the spend would pass its budget.
+"""
+from dataclasses import dataclass, replace
+from typing import Dict, Optional, Tuple
+
+# USD per million (input, output) tokens, as listed by the providers
+PRICES: Dict[str, Tuple[float, float]] = {
+    "claude-sonnet-4-5": (3.00, 15.00),
+    "claude-haiku-4-5": (1.00, 5.00),
+    "claude-opus-4-1": (15.00, 75.00),
+    "deepseek-chat": (0.28, 0.42),
+    "deepseek-reasoner": (0.28, 0.42),
+    "qwen-mt-turbo": (0.16, 0.49),
+    "qwen-mt-plus": (2.46, 7.37),
+}
+
+# Anthropic bills prompt cache writes at 1.25x and reads at 0.1x the input price
+CACHE_WRITE_FACTOR = 1.25
+CACHE_READ_FACTOR = 0.1
+# Batch APIs bill half the realtime price
+BATCH_FACTOR = 0.5
+
+
+class BudgetExceeded(RuntimeError):
+    """The next request would spend more than the translator's budget"""
+
+
+@dataclass(frozen=True, slots=True)
+class CostRecord:
+    model: str
+    input_tokens: int
+    output_tokens: int
+    cost_usd: float
+
+
+def model_price(model: str) -> Optional[Tuple[float, float]]:
+    """
+    Look up the price of a model
+
+    Dated model ids (claude-haiku-4-5-20251001) match their undated entry.
+
+    Returns:
+        USD per million (input, output) tokens, or None for unknown models
+    """
+    price = PRICES.get(model)
+    if price is None:
+        matches = [name for name in PRICES if model.startswith(name)]
+        if matches:
+            price = PRICES[max(matches, key=len)]
+    return price
+
+
+def usage_cost(
+    model: str,
+    input_tokens: int,
+    output_tokens: int,
+    cache_write_tokens: int = 0,
+    cache_read_tokens: int = 0,
+    factor: float = 1.0
+) -> float:
+    """
+    Price of one request in USD, 0 for models missing from PRICES
+
+    Args:
+        input_tokens: Uncached input tokens
+        cache_write_tokens: Input tokens written to the prompt cache
+        cache_read_tokens: Input tokens read from the prompt cache
+        factor: Discount applied to the whole request, e.g. BATCH_FACTOR
+    """
+    price = model_price(model)
+    if price is None:
+        return 0.0
+    input_price, output_price = price
+    billed_input = input_tokens + cache_write_tokens * CACHE_WRITE_FACTOR + cache_read_tokens * CACHE_READ_FACTOR
+    return (billed_input * input_price + output_tokens * output_price) / 1_000_000 * factor
+
+
+@dataclass(frozen=True, slots=True)
+class CostTracker:
+    """Spend so far, add() returns a new tracker instead of mutating this one"""
+    budget_limit: Optional[float] = None
+    records: Tuple[CostRecord, ...] = ()
+    # Running sum of records, so checking the budget doesn't rescan them
+    spent: float = 0.0
+
+    def add(self, record: CostRecord) -> "CostTracker":
+        return replace(self, records=self.records + (record,), spent=self.spent + record.cost_usd)
+
+    def total_cost(self) -> float:
+        return self.spent
+
+    def check(self, estimate: float = 0.0) -> None:
+        """
+        Make sure a request of the estimated cost still fits the budget
+
+        Raises:
+            BudgetExceeded: If the spend plus the estimate reaches budget_limit
+        """
+        if self.budget_limit is None:
+            return
+        total = self.total_cost()
+        if total + estimate >= self.budget_limit:
+            raise BudgetExceeded(
+                f"Budget of ${self.budget_limit:.4f} exceeded: ${total:.4f} spent, next request estimated at ${estimate:.4f}"
+            )
@@ -0,0 +1,55 @@
+"""
+API error classification
+
+Translators raise TransientError for failures that may succeed when retried
+(throttling, overload, gateway errors) and PermanentError for everything a
+retry can't fix (bad request, auth, unknown model). Both subclass ValueError,
+which is what the translators raised for every API error before.
+"""
+from typing import Optional
+
+# Timeouts, overload and gateway errors
+_TRANSIENT_STATUS = {408, 500, 502, 503, 504, 529}
+
+
+class TransientError(ValueError):
+    """The request failed but may succeed when retried"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimitError(TransientError):
+    """The API rejected a request because of rate limits"""
+
+
+class PermanentError(ValueError):
+    """The request can't succeed as sent, retrying it only wastes time and money"""
+
+
+class PromptTooLongError(PermanentError):
+    """The prompt plus the reserved reply tokens don't fit the model's context window"""
+
+
+def status_error(status: int, message: str, retry_after: Optional[float] = None) -> ValueError:
+    """
+    Build the error for a non 2xx HTTP status
+
+    Returns:
+        RateLimitError for 429, TransientError for timeouts / overload / gateway
+        errors and PermanentError for anything else
+    """
+    if status == 429:
+        return RateLimitError(message, retry_after)
+    if status in _TRANSIENT_STATUS:
+        return TransientError(message, retry_after)
+    return PermanentError(message)
+
+
+def parse_retry_after(headers) -> Optional[float]:
+    """Seconds from a Retry-After header, None if absent or not a number"""
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
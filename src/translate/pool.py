@@ -0,0 +1,134 @@
+"""
+Load balancing across several translators
+
+TranslatorPool spreads requests over translators of different providers (or
+several keys of one provider), so their rate limits add up and an outage of
+one endpoint doesn't stall a whole run.
+"""
+import asyncio
+import time
+from typing import List, Optional
+
+import httpx
+
+from src.translate.errors import TransientError
+from src.translate.translator import LLMTranslator
+
+# Failures another translator may not share, anything else (PermanentError,
+# PromptTooLongError, BudgetExceeded) would fail the same way everywhere
+_FAILOVER_ERRORS = (TransientError, httpx.TransportError)
+
+
+class TranslatorPool:
+    """Send each request to the least loaded healthy translator, failing over on transient errors"""
+
+    def __init__(self, translators: List[LLMTranslator], concurrency_limits: Optional[List[int]] = None, cooldown: float = 30.0):
+        """
+        Initialize translator pool
+
+        Args:
+            translators: Translators to balance over
+            concurrency_limits: Maximum requests in flight per translator (optional, 8 each by default)
+            cooldown: Seconds a translator is skipped after a transient failure
+
+        Raises:
+            ValueError: If no translators are given or the limits don't match them
+        """
+        if not translators:
+            raise ValueError("TranslatorPool needs at least one translator")
+        if concurrency_limits is None:
+            concurrency_limits = [8] * len(translators)
+        if len(concurrency_limits) != len(translators):
+            raise ValueError("concurrency_limits must have one entry per translator")
+        self.translators = translators
+        self.concurrency_limits = [max(1, limit) for limit in concurrency_limits]
+        self.cooldown = cooldown
+        self._semaphores = [asyncio.Semaphore(limit) for limit in self.concurrency_limits]
+        self._in_flight = [0] * len(translators)
+        self._cooling_until = [0.0] * len(translators)
+        self._calls = [0] * len(translators)
+        self._errors = [0] * len(translators)
+
+    @property
+    def stats(self) -> List[dict]:
+        """Per translator counters"""
+        now = time.monotonic()
+        return [
+            {
+                "provider": type(translator).__name__,
+                "model": translator.model_id,
+                "calls": self._calls[i],
+                "errors": self._errors[i],
+                "in_flight": self._in_flight[i],
+                "cooling": self._cooling_until[i] > now,
+            }
+            for i, translator in enumerate(self.translators)
+        ]
+
+    def _pick(self, tried: set) -> int:
+        """Index of the least loaded translator not tried yet, preferring ones that aren't cooling down"""
+        now = time.monotonic()
+        candidates = [i for i in range(len(self.translators)) if i not in tried]
+        return min(candidates, key=lambda i: (
+            self._cooling_until[i] > now,
+            self._in_flight[i] / self.concurrency_limits[i],
+        ))
+
+    def _failed(self, i: int, error: Exception) -> None:
+        self._errors[i] += 1
+        self._cooling_until[i] = time.monotonic() + self.cooldown
+        translator = self.translators[i]
+        print(f"{type(translator).__name__} ({translator.model_id}) failed: {error}, cooling down for {self.cooldown:.0f}s")
+
+    def translate(self, prompt: str, max_tokens: int = 4000, target_lang: str = 'zh-CN', item_count: Optional[int] = None, system: Optional[str] = None) -> str:
+        """
+        Translate with the least loaded translator, trying the others if it fails transiently
+
+        Raises:
+            TransientError: The last translator's error if every translator failed
+            Exception: Any permanent error, at once and without trying the others
+        """
+        tried = set()
+        while True:
+            i = self._pick(tried)
+            tried.add(i)
+            self._in_flight[i] += 1
+            self._calls[i] += 1
+            try:
+                return self.translators[i].translate(prompt, max_tokens=max_tokens, target_lang=target_lang, item_count=item_count, system=system)
+            except _FAILOVER_ERRORS as e:
+                self._failed(i, e)
+                if len(tried) == len(self.translators):
+                    raise
+            finally:
+                self._in_flight[i] -= 1
+
+    async def atranslate(self, prompt: str, max_tokens: int = 4000, target_lang: str = 'zh-CN', item_count: Optional[int] = None, system: Optional[str] = None) -> str:
+        """
+        Async version of translate, waiting for a free slot of the chosen translator
+
+        Raises:
+            TransientError: The last translator's error if every translator failed
+            Exception: Any permanent error, at once and without trying the others
+        """
+        tried = set()
+        while True:
+            i = self._pick(tried)
+            tried.add(i)
+            # Count the request before waiting so concurrent callers spread out
+            self._in_flight[i] += 1
+            try:
+                async with self._semaphores[i]:
+                    self._calls[i] += 1
+                    return await self.translators[i].atranslate(prompt, max_tokens=max_tokens, target_lang=target_lang, item_count=item_count, system=system)
+            except _FAILOVER_ERRORS as e:
+                self._failed(i, e)
+                if len(tried) == len(self.translators):
+                    raise
+            finally:
+                self._in_flight[i] -= 1
+
+    async def aclose(self) -> None:
+        """Close the async clients of every translator"""
+        for translator in self.translators:
+            await translator.aclose()
@@ -1,24 +1,26 @@
 from pathlib import Path
-import json
+import hashlib
 import random
+from typing import Iterable, Union
 from src.model.localization import I18nLanguage
+from src.jsonio import read_json
 
 author_exclude_keyword = ["ai", "claude", "llm"]
 
-def get_reference_prompt(input_file: Path, locale: I18nLanguage, limit: int = 30) -> str:
+def get_reference_prompt(input_file: Union[Path, Iterable[Path]], locale: I18nLanguage, limit: int = 30) -> str:
     """
     Generate reference prompt from translation file
     
     Args:
-        input_file: Path to translation JSON file
+        input_file: Path to translation JSON file, or several paths to sample from
         locale: Target locale for translation examples
         limit: Maximum number of examples to include
         
     Returns:
         Formatted string with original text and translations
     """
-    with open(input_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    input_files = [input_file] if isinstance(input_file, (str, Path)) else input_file
+    data = [item for file in input_files for item in read_json(file)]
     
     # Filter items that have translations for the specified locale
     valid_items = []
@@ -40,8 +42,11 @@ def get_reference_prompt(input_file: Path, locale: I18nLanguage, limit: int = 30
             translated_text = item["translation"][locale_key]["text"]
             valid_items.append((raw_text, translated_text))
     
-    # Shuffle the items randomly
-    random.shuffle(valid_items)
+    # Shuffle the items pseudo-randomly, seeded by the examples themselves so the
+    # prompt (and with it the response cache key) only changes when they do
+    valid_items.sort(key=lambda pair: (str(pair[0]), pair[1]))
+    seed = hashlib.sha256("\n".join(f"{raw}\0{text}" for raw, text in valid_items).encode("utf-8")).digest()
+    random.Random(seed).shuffle(valid_items)
     
     # Take only the first 'limit' items
     selected_items = valid_items[:limit]
@@ -0,0 +1,103 @@
+"""
+Client-side rate limiting for LLM APIs
+
+Providers limit both requests and tokens per minute. RateLimiter keeps one
+token bucket per limit and makes callers wait until both have room, so long
+runs stay just under the ceiling instead of bouncing off HTTP 429s.
+"""
+import asyncio
+import threading
+import time
+from functools import lru_cache
+from typing import Optional
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None
+
+
+class TokenBucket:
+    """Bucket refilled continuously at capacity per period"""
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """
+        Take amount out of the bucket
+
+        The bucket may go into debt, later callers then queue behind the
+        earlier ones instead of racing them for the next refill.
+
+        Returns:
+            Seconds to wait before the reserved amount may be used
+        """
+        # A single request larger than the bucket could never fit
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits of one API"""
+
+    def __init__(self, rpm: Optional[int] = None, tpm: Optional[int] = None):
+        """
+        Initialize rate limiter
+
+        Args:
+            rpm: Requests per minute (optional, unlimited if not provided)
+            tpm: Input tokens per minute (optional, unlimited if not provided)
+        """
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+
+    def _reserve(self, tokens: int) -> float:
+        wait = 0.0
+        if self.requests is not None:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.reserve(tokens))
+        return wait
+
+    def acquire(self, tokens: int) -> None:
+        """Block until a request of about this many input tokens may be sent"""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int) -> None:
+        """Wait without blocking the event loop until a request may be sent"""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough input token count of text
+
+    Uses tiktoken's cl100k_base encoding when it is installed. None of the
+    providers publish their tokenizer, so this is an approximation either way.
+    Without tiktoken counts UTF-8 bytes / 4 rather than characters / 4,
+    Japanese text takes about one token per character and 3 bytes per character.
+    """
+    if tiktoken is not None:
+        return len(_encoding().encode(text, disallowed_special=())) + 1
+    return len(text.encode("utf-8")) // 4 + 1
@@ -2,15 +2,89 @@
 LLM Translator base class and implementations
 """
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from contextlib import contextmanager
+from typing import Any, ClassVar, Dict, Generator, Iterator, List, Optional, Tuple, Type
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import weakref
+from pathlib import Path
 import anthropic
-import requests
+import httpx
+
+from src import jsonio
+from src.translate import cache
+from src.translate.cost import BATCH_FACTOR, CostRecord, CostTracker, usage_cost
+from src.translate.errors import PermanentError, PromptTooLongError, TransientError, parse_retry_after, status_error
+from src.translate.ratelimit import RateLimiter, estimate_tokens
+
+try:
+    import h2  # noqa: F401 - httpx only needs it to be importable
+except ImportError:  # pragma: no cover - optional dependency
+    h2 = None
+
+
+_ITEMS_INSTRUCTIONS = """Translate the value of every entry of the JSON object into {target_lang}.
+Reply with ONLY a JSON object that has the same keys and the translations as values,
+e.g. {{"1": "translated text 1", "2": "translated text 2"}}
+Do not include any explanatory text or markdown code format."""
+# Estimated tokens of the instructions and JSON punctuation per pack and per item
+_ITEMS_PROMPT_OVERHEAD = 200
+_ITEM_OVERHEAD = 8
+
+_MAX_ATTEMPTS = 3
+_BACKOFF_BASE = 1.0
+_BACKOFF_MAX = 60.0
+
+# Failures worth retrying, PermanentError and anything else fails at once
+_RETRYABLE_ERRORS = (TransientError, httpx.TransportError)
 
 
 class LLMTranslator(ABC):
     """Base class for LLM-based translators"""
     
-    def __init__(self, api_key: str, base_url: Optional[str] = None, model_id: Optional[str] = None):
+    # No per-instance __dict__, pools may hold many translators.
+    # __weakref__ lets weakref.finalize release the shared client.
+    __slots__ = (
+        "api_key", "base_url", "model_id", "cache_enabled", "cache_ttl",
+        "rate_limiter", "_memo", "http_max_connections", "http_max_keepalive",
+        "cost_tracker", "_cost_lock", "client", "_aclient", "_client_key", "__weakref__",
+    )
+    
+    # Whether identical requests return identical responses, which makes
+    # caching them safe. Providers sampling at a high temperature opt out.
+    deterministic = True
+    
+    # Published per-minute limits of the provider, None means unlimited
+    default_rpm: Optional[int] = None
+    default_tpm: Optional[int] = None
+    # Context window in tokens per model id, dated ids match their undated entry.
+    # Models missing here are not checked.
+    context_limits: Dict[str, int] = {}
+    # Sync clients shared by every translator with the same provider, key, endpoint and
+    # pool size, so short-lived translators reuse one warm connection pool
+    _client_cache: ClassVar[Dict[tuple, Any]] = {}
+    _client_refs: ClassVar[Dict[tuple, int]] = {}
+    _client_lock: ClassVar[threading.Lock] = threading.Lock()
+    
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        model_id: Optional[str] = None,
+        cache_enabled: Optional[bool] = None,
+        cache_ttl: Optional[float] = None,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        prewarm: bool = True,
+        http_max_connections: int = 100,
+        http_max_keepalive: int = 50,
+        budget_limit: Optional[float] = None
+    ):
         """
         Initialize LLM translator
         
@@ -18,22 +92,138 @@ class LLMTranslator(ABC):
             api_key: API key for the LLM service
             base_url: Base URL for the API endpoint (optional)
             model_id: Model identifier to use (optional, uses default if not provided)
+            cache_enabled: Reuse responses of identical requests (optional, defaults to
+                on for deterministic providers)
+            cache_ttl: Seconds a cached response stays valid (optional, never expires by default)
+            rpm: Requests per minute allowed (optional, defaults to the provider limit,
+                0 disables the limit)
+            tpm: Input tokens per minute allowed (optional, defaults to the provider limit,
+                0 disables the limit)
+            prewarm: Open the connection in the background right away, so the first
+                request doesn't pay for the TLS handshake (default: True)
+            http_max_connections: Size of the HTTP connection pool, raise it together
+                with the request concurrency (default: 100)
+            http_max_keepalive: Idle connections kept open for reuse (default: 50)
+            budget_limit: Stop sending requests once this many USD were spent (optional)
         """
         self.api_key = api_key
         self.base_url = base_url
         self.model_id = model_id or self.get_default_model()
+        self.cache_enabled = self.deterministic if cache_enabled is None else cache_enabled
+        self.cache_ttl = cache_ttl
+        self.rate_limiter = RateLimiter(
+            self.default_rpm if rpm is None else rpm,
+            self.default_tpm if tpm is None else tpm
+        )
+        self._memo: Dict[str, str] = {}
+        self.http_max_connections = http_max_connections
+        self.http_max_keepalive = http_max_keepalive
+        self.cost_tracker = CostTracker(budget_limit)
+        self._cost_lock = threading.Lock()
         self.client = self._setup_client()
+        self._aclient = None
+        # A reused client is warm already
+        if prewarm and LLMTranslator._client_refs[self._client_key] == 1:
+            threading.Thread(target=self._prewarm, name=f"{type(self).__name__}-prewarm", daemon=True).start()
     
-    @abstractmethod
     def _setup_client(self):
         """
-        Setup and return the API client
+        Return the shared API client for this translator's settings, building it on first use
+        
+        The client is closed once the last translator using it is garbage collected
+        
+        Returns:
+            Configured API client
+        """
+        key = (type(self).__name__, self.api_key, self.base_url, self.http_max_connections, self.http_max_keepalive)
+        with LLMTranslator._client_lock:
+            client = LLMTranslator._client_cache.get(key)
+            if client is None:
+                client = LLMTranslator._client_cache[key] = self._build_client()
+            LLMTranslator._client_refs[key] = LLMTranslator._client_refs.get(key, 0) + 1
+        self._client_key = key
+        weakref.finalize(self, LLMTranslator._release_client, key)
+        return client
+    
+    @classmethod
+    def register(cls, name: str) -> Type["LLMTranslator"]:
+        """
+        Make this translator class available to create_translator() under a provider name
+        
+        Call at import time, e.g. ``MyTranslator.register("mine")``
+        
+        Returns:
+            The class itself
+        """
+        _REGISTRY[name.lower()] = cls
+        return cls
+    
+    @staticmethod
+    def _release_client(key: tuple) -> None:
+        """Drop one reference to a shared client, closing it with the last one"""
+        with LLMTranslator._client_lock:
+            LLMTranslator._client_refs[key] -= 1
+            if LLMTranslator._client_refs[key] > 0:
+                return
+            del LLMTranslator._client_refs[key]
+            client = LLMTranslator._client_cache.pop(key)
+        client.close()
+    
+    @abstractmethod
+    def _build_client(self):
+        """
+        Build a new API client
         
         Returns:
             Configured API client
         """
         pass
     
+    @abstractmethod
+    def _setup_async_client(self):
+        """
+        Setup and return the async API client
+        
+        Called lazily from inside the event loop that will use the client
+        
+        Returns:
+            Configured async API client
+        """
+        pass
+    
+    def _http_limits(self) -> httpx.Limits:
+        """Connection pool sizing shared by the sync and async clients"""
+        return httpx.Limits(max_connections=self.http_max_connections, max_keepalive_connections=self.http_max_keepalive)
+    
+    def _prewarm(self) -> None:
+        """Send a cheap request so the sync client's pool holds an open connection"""
+        try:
+            self._warm_up()
+        except Exception:
+            # Only the side effect of connecting matters
+            pass
+    
+    def _warm_up(self) -> None:
+        """Provider specific cheap request, nothing by default"""
+        pass
+    
+    def _async_client(self):
+        """Return the async client, creating it on first use"""
+        if self._aclient is None:
+            self._aclient = self._setup_async_client()
+        return self._aclient
+    
+    async def aclose(self) -> None:
+        """
+        Close the async client
+        
+        The client is bound to the event loop it was first used in, call this before
+        that loop ends. A later atranslate() call creates a fresh client.
+        """
+        if self._aclient is not None:
+            aclient, self._aclient = self._aclient, None
+            await aclient.aclose()
+    
     @abstractmethod
     def get_default_model(self) -> str:
         """
@@ -44,36 +234,658 @@ class LLMTranslator(ABC):
         """
         pass
     
-    @abstractmethod
-    def translate(self, prompt: str, max_tokens: int = 4000, target_lang: str = 'zh-CN') -> str:
+    def model_for(self, prompt: str, item_count: Optional[int] = None, system: Optional[str] = None) -> str:
+        """
+        Pick the model that serves a prompt
+        
+        Args:
+            prompt: The full prompt including texts to translate
+            item_count: Number of texts in the prompt (optional)
+            system: Static instructions sent ahead of the prompt (optional)
+            
+        Returns:
+            Model identifier, the configured model unless a subclass routes by prompt size
+        """
+        return self.model_id
+    
+    def models(self) -> List[str]:
+        """Every model model_for() may pick, the configured one first"""
+        return [self.model_id]
+    
+    def translate(self, prompt: str, max_tokens: int = 4000, target_lang: str = 'zh-CN', item_count: Optional[int] = None, system: Optional[str] = None) -> str:
         """
         Translate using the LLM API
         
+        Identical requests are answered from the response cache when it is enabled
+        
         Args:
             prompt: The full prompt including texts to translate
             max_tokens: Maximum tokens for the response
+            item_count: Number of texts in the prompt, used for model routing (optional)
+            system: Static instructions shared across calls, sent separately so the
+                provider can cache them (optional)
             
+        Returns:
+            Translated text response from the API
+        """
+        model = self.model_for(prompt, item_count, system)
+        key = self._cache_key(prompt, target_lang, model, system)
+        text = self._cached_response(key)
+        if text is None:
+            text = self._call(prompt, max_tokens, target_lang, model, system)
+            self._store_response(key, text)
+        return text
+    
+    async def atranslate(self, prompt: str, max_tokens: int = 4000, target_lang: str = 'zh-CN', item_count: Optional[int] = None, system: Optional[str] = None) -> str:
+        """
+        Translate using the LLM API without blocking the event loop
+        
+        Identical requests are answered from the response cache when it is enabled
+        
+        Args:
+            prompt: The full prompt including texts to translate
+            max_tokens: Maximum tokens for the response
+            item_count: Number of texts in the prompt, used for model routing (optional)
+            system: Static instructions shared across calls, sent separately so the
+                provider can cache them (optional)
+            
+        Returns:
+            Translated text response from the API
+        """
+        model = self.model_for(prompt, item_count, system)
+        key = self._cache_key(prompt, target_lang, model, system)
+        text = self._cached_response(key)
+        if text is None:
+            text = await self._acall(prompt, max_tokens, target_lang, model, system)
+            self._store_response(key, text)
+        return text
+    
+    @abstractmethod
+    def _translate(self, prompt: str, max_tokens: int, target_lang: str, model: str, system: Optional[str]) -> str:
+        """
+        Call the LLM API
+        
         Returns:
             Translated text response from the API
         """
         pass
+    
+    @abstractmethod
+    async def _atranslate(self, prompt: str, max_tokens: int, target_lang: str, model: str, system: Optional[str]) -> str:
+        """
+        Call the LLM API asynchronously
+        
+        Returns:
+            Translated text response from the API
+        """
+        pass
+    
+    def context_limit(self, model: str) -> Optional[int]:
+        """Context window of a model in tokens, None if unknown"""
+        return _per_model(self.context_limits, model)
+    
+    def _check_prompt_size(self, tokens: int, max_tokens: int, model: str) -> None:
+        """
+        Make sure a request fits the model's context window before sending it
+        
+        Args:
+            tokens: Estimated input tokens of the prompt and system instructions
+            max_tokens: Tokens reserved for the response
+            
+        Raises:
+            PromptTooLongError: If tokens + max_tokens exceeds the context window,
+                the API would only answer with a 400 after a full round trip
+        """
+        limit = self.context_limit(model)
+        if limit is not None and tokens + max_tokens > limit:
+            raise PromptTooLongError(
+                f"Prompt of about {tokens} tokens plus max_tokens={max_tokens} exceeds the {limit} token context of {model}, "
+                "split the texts into smaller chunks"
+            )
+    
+    def _limited_tokens(self, prompt: str, model: str, system: Optional[str]) -> int:
+        """Estimated input tokens of a request that count against the tpm limit"""
+        return estimate_tokens(prompt) + (estimate_tokens(system) if system else 0)
+    
+    def _preflight(self, prompt: str, max_tokens: int, model: str, system: Optional[str]) -> Tuple[float, int]:
+        """
+        Checks shared by every realtime request before its first attempt
+        
+        Raises:
+            PromptTooLongError: If the request can't fit the context window of the model
+            
+        Returns:
+            Estimated cost of one attempt in USD and the tokens to take from the rate limiter
+        """
+        tokens = estimate_tokens(prompt) + (estimate_tokens(system) if system else 0)
+        self._check_prompt_size(tokens, max_tokens, model)
+        # The reply is about as long as the texts to translate
+        estimate = usage_cost(model, tokens, estimate_tokens(prompt))
+        return estimate, self._limited_tokens(prompt, model, system)
+    
+    def _call(self, prompt: str, max_tokens: int, target_lang: str, model: str, system: Optional[str]) -> str:
+        """Call the API within the rate limits, retrying transient failures with jittered exponential backoff"""
+        estimate, limited = self._preflight(prompt, max_tokens, model, system)
+        for attempt in range(1, _MAX_ATTEMPTS + 1):
+            self.cost_tracker.check(estimate)
+            self.rate_limiter.acquire(limited)
+            try:
+                return self._translate(prompt, max_tokens, target_lang, model, system)
+            except _RETRYABLE_ERRORS as e:
+                if attempt == _MAX_ATTEMPTS:
+                    raise
+                time.sleep(_retry_wait(e, attempt))
+    
+    async def _acall(self, prompt: str, max_tokens: int, target_lang: str, model: str, system: Optional[str]) -> str:
+        """Async version of _call"""
+        estimate, limited = self._preflight(prompt, max_tokens, model, system)
+        for attempt in range(1, _MAX_ATTEMPTS + 1):
+            self.cost_tracker.check(estimate)
+            await self.rate_limiter.aacquire(limited)
+            try:
+                return await self._atranslate(prompt, max_tokens, target_lang, model, system)
+            except _RETRYABLE_ERRORS as e:
+                if attempt == _MAX_ATTEMPTS:
+                    raise
+                await asyncio.sleep(_retry_wait(e, attempt))
+    
+    def _record_usage(
+        self,
+        model: str,
+        input_tokens: int,
+        output_tokens: int,
+        cache_write_tokens: int = 0,
+        cache_read_tokens: int = 0,
+        factor: float = 1.0
+    ) -> None:
+        """Add the token usage of one response to the cost tracker"""
+        record = CostRecord(
+            model=model,
+            input_tokens=input_tokens + cache_write_tokens + cache_read_tokens,
+            output_tokens=output_tokens,
+            cost_usd=usage_cost(model, input_tokens, output_tokens, cache_write_tokens, cache_read_tokens, factor)
+        )
+        with self._cost_lock:
+            self.cost_tracker = self.cost_tracker.add(record)
+    
+    def _cache_key(self, prompt: str, target_lang: str, model: str, system: Optional[str] = None) -> str:
+        """Hash everything that determines the response"""
+        return hashlib.sha256(json.dumps({
+            "provider": type(self).__name__,
+            "model": model,
+            "system": system,
+            "prompt": prompt,
+            "target_lang": target_lang
+        }, sort_keys=True).encode("utf-8")).hexdigest()
+    
+    def _cached_response(self, key: str) -> Optional[str]:
+        """Look the request up in memory first, then in the on-disk cache"""
+        if not self.cache_enabled:
+            return None
+        text = self._memo.get(key)
+        if text is None:
+            text = cache.get_response(key, self.cache_ttl)
+            if text is not None:
+                self._memo[key] = text
+        return text
+    
+    def _store_response(self, key: str, text: str) -> None:
+        if not self.cache_enabled:
+            return
+        self._memo[key] = text
+        cache.put_response(key, text)
+    
+    def discard_response(self, prompt: str, target_lang: str = 'zh-CN', item_count: Optional[int] = None, system: Optional[str] = None) -> None:
+        """
+        Drop the cached response of a request
+        
+        Responses are cached before anyone has looked at them. Call this when the
+        reply turns out to be unusable (invalid JSON, wrong item count), otherwise
+        every rerun would replay it instead of asking the API again. Takes the same
+        arguments as translate().
+        """
+        if not self.cache_enabled:
+            return
+        key = self._cache_key(prompt, target_lang, self.model_for(prompt, item_count, system), system)
+        self._memo.pop(key, None)
+        cache.delete_response(key)
+    
+    def _record_chat_usage(self, model: str, usage: Optional[dict], factor: float = 1.0) -> None:
+        """Track the cost of an OpenAI compatible response from its usage field"""
+        usage = usage or {}
+        self._record_usage(model, usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0), factor=factor)
+    
+    async def translate_batch(self, prompts: List[str], max_tokens: int = 4000, target_lang: str = 'zh-CN', concurrency: int = 8) -> List[str]:
+        """
+        Translate several prompts concurrently
+        
+        Args:
+            prompts: Full prompts to translate
+            max_tokens: Maximum tokens for each response
+            concurrency: Maximum number of requests in flight
+            
+        Returns:
+            Translated text responses, in the same order as prompts
+        """
+        sem = asyncio.Semaphore(max(1, concurrency))
+        
+        async def _translate_one(prompt: str) -> str:
+            async with sem:
+                return await self.atranslate(prompt, max_tokens=max_tokens, target_lang=target_lang)
+        
+        return await asyncio.gather(*(_translate_one(prompt) for prompt in prompts))
+    
+    def stream_translate(self, prompt: str, max_tokens: int = 4000, target_lang: str = 'zh-CN', item_count: Optional[int] = None, system: Optional[str] = None) -> Iterator[str]:
+        """
+        Translate using the LLM API, yielding the response text as it arrives
+        
+        A cached response is yielded in one piece. Transient failures are retried
+        like translate() as long as no text has been yielded yet.
+        
+        Args:
+            prompt: The full prompt including texts to translate
+            max_tokens: Maximum tokens for the response
+            item_count: Number of texts in the prompt, used for model routing (optional)
+            system: Static instructions shared across calls (optional)
+            
+        Yields:
+            Consecutive pieces of the translated text response
+        """
+        model = self.model_for(prompt, item_count, system)
+        key = self._cache_key(prompt, target_lang, model, system)
+        text = self._cached_response(key)
+        if text is not None:
+            yield text
+            return
+        
+        estimate, limited = self._preflight(prompt, max_tokens, model, system)
+        for attempt in range(1, _MAX_ATTEMPTS + 1):
+            self.cost_tracker.check(estimate)
+            self.rate_limiter.acquire(limited)
+            parts: List[str] = []
+            try:
+                for part in self._stream(prompt, max_tokens, target_lang, model, system):
+                    parts.append(part)
+                    yield part
+                break
+            except _RETRYABLE_ERRORS as e:
+                if parts or attempt == _MAX_ATTEMPTS:
+                    raise
+                time.sleep(_retry_wait(e, attempt))
+        self._store_response(key, "".join(parts))
+    
+    def _stream(self, prompt: str, max_tokens: int, target_lang: str, model: str, system: Optional[str]) -> Iterator[str]:
+        """
+        Call the LLM API with a streamed response
+        
+        Providers without streaming yield the whole response at once
+        """
+        yield self._translate(prompt, max_tokens, target_lang, model, system)
+    
+    def translate_items(self, items: List[str], target_lang: str = 'zh-CN', max_tokens: int = 4000, system: Optional[str] = None) -> List[str]:
+        """
+        Translate short texts, packing as many as fit into each request
+        
+        Items are packed greedily into a JSON object keyed by number until the
+        estimated size reaches max_tokens, and the model answers with the same keys.
+        If a reply can't be parsed, the items of that pack are sent one at a time.
+        
+        Args:
+            items: Texts to translate
+            max_tokens: Maximum tokens for each response, also bounds the pack size
+            system: Extra instructions put before the packing instructions (optional)
+            
+        Returns:
+            Translated texts in the same order as items
+            
+        Raises:
+            ValueError: If the reply for a single item is still unusable
+        """
+        instructions = _ITEMS_INSTRUCTIONS.format(target_lang=target_lang)
+        if system:
+            instructions = f"{system}\n\n{instructions}"
+        
+        packs: List[List[str]] = []
+        budget = max_tokens - _ITEMS_PROMPT_OVERHEAD
+        used = 0
+        for item in items:
+            cost = estimate_tokens(item) + _ITEM_OVERHEAD
+            if packs and used + cost <= budget:
+                packs[-1].append(item)
+                used += cost
+            else:
+                packs.append([item])
+                used = cost
+        
+        results: List[str] = []
+        for pack in packs:
+            try:
+                results.extend(self._translate_pack(pack, instructions, max_tokens, target_lang))
+            except (TransientError, PermanentError):
+                # API failures, splitting the pack wouldn't help
+                raise
+            except ValueError as e:
+                if len(pack) == 1:
+                    raise
+                print(f"Falling back to one request per item for {len(pack)} items: {e}")
+                for item in pack:
+                    results.extend(self._translate_pack([item], instructions, max_tokens, target_lang))
+        return results
+    
+    def _translate_pack(self, pack: List[str], instructions: str, max_tokens: int, target_lang: str) -> List[str]:
+        """
+        Translate one pack of translate_items
+        
+        Raises:
+            ValueError: If the reply is not a JSON object holding every key
+        """
+        prompt = json.dumps({str(i): item for i, item in enumerate(pack, 1)}, ensure_ascii=False, indent=2)
+        response = self.translate(prompt, max_tokens=max_tokens, target_lang=target_lang, item_count=len(pack), system=instructions).strip()
+        try:
+            return _parse_items(response, len(pack))
+        except ValueError:
+            self.discard_response(prompt, target_lang=target_lang, item_count=len(pack), system=instructions)
+            raise
+    
+    async def translate_many(
+        self,
+        prompts: List[str],
+        output_jsonl: Path,
+        max_tokens: int = 4000,
+        target_lang: str = 'zh-CN',
+        system: Optional[str] = None,
+        concurrency: int = 8
+    ) -> List[Optional[str]]:
+        """
+        Translate many prompts concurrently, checkpointing every response to a JSONL file
+        
+        Each success is appended as {"idx", "prompt_hash", "response"} and fsynced, so
+        a rerun after a crash reads the file back and only sends prompts whose hash
+        is not in it yet. A torn last line is ignored.
+        
+        Args:
+            prompts: Prompts to translate
+            output_jsonl: Checkpoint file, created if missing
+            max_tokens: Maximum tokens for each response
+            system: Static instructions shared by every prompt (optional)
+            concurrency: Maximum number of requests in flight
+            
+        Returns:
+            Responses in the same order as prompts, None where a request failed
+        """
+        output_jsonl = Path(output_jsonl)
+        done: Dict[str, str] = {}
+        torn = False
+        if output_jsonl.exists():
+            with open(output_jsonl, encoding="utf-8") as f:
+                for line in f:
+                    torn = not line.endswith("\n")
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    done[entry["prompt_hash"]] = entry["response"]
+        
+        hashes = [_prompt_hash(prompt, target_lang, system) for prompt in prompts]
+        results: List[Optional[str]] = [done.get(h) for h in hashes]
+        todo = [i for i, text in enumerate(results) if text is None]
+        if len(todo) < len(prompts):
+            print(f"Resuming from {output_jsonl}: {len(prompts) - len(todo)} of {len(prompts)} prompts already done")
+        if not todo:
+            return results
+        
+        sem = asyncio.Semaphore(max(1, concurrency))
+        lock = asyncio.Lock()
+        with open(output_jsonl, "a", encoding="utf-8") as out:
+            if torn:
+                # Terminate the partial line so the next entry starts on its own line
+                out.write("\n")
+            
+            async def _translate_one(i: int) -> None:
+                try:
+                    async with sem:
+                        text = await self.atranslate(prompts[i], max_tokens=max_tokens, target_lang=target_lang, system=system)
+                except Exception as e:
+                    print(f"Error translating prompt {i}: {e}")
+                    return
+                results[i] = text
+                line = json.dumps({"idx": i, "prompt_hash": hashes[i], "response": text}, ensure_ascii=False)
+                async with lock:
+                    out.write(line + "\n")
+                    out.flush()
+                    os.fsync(out.fileno())
+            
+            await asyncio.gather(*(_translate_one(i) for i in todo))
+        return results
+    
+    def translate_batch_job(
+        self,
+        prompts: List[str],
+        max_tokens: int = 4000,
+        target_lang: str = 'zh-CN',
+        item_counts: Optional[List[int]] = None,
+        system: Optional[str] = None,
+        poll_interval: float = 60.0
+    ) -> List[Optional[str]]:
+        """
+        Translate several prompts through the provider's batch API
+        
+        Batch jobs cost about half of realtime requests but may take up to 24 hours,
+        this call blocks until the job has ended. Providers without a batch API fall
+        back to realtime requests. Cached responses are never resubmitted.
+        
+        Args:
+            prompts: Prompts to translate
+            max_tokens: Maximum tokens for each response
+            item_counts: Number of texts in each prompt, used for model routing (optional)
+            system: Static instructions shared by every prompt (optional)
+            poll_interval: Seconds between job status checks
+            
+        Returns:
+            Translated text responses in the same order as prompts, None where a
+            request failed
+        """
+        results: List[Optional[str]] = [None] * len(prompts)
+        pending = []
+        for i, prompt in enumerate(prompts):
+            model = self.model_for(prompt, item_counts[i] if item_counts else None, system)
+            key = self._cache_key(prompt, target_lang, model, system)
+            results[i] = self._cached_response(key)
+            if results[i] is not None:
+                continue
+            try:
+                tokens = estimate_tokens(prompt) + (estimate_tokens(system) if system else 0)
+                self._check_prompt_size(tokens, max_tokens, model)
+            except PromptTooLongError as e:
+                # One oversized prompt shouldn't fail the whole job
+                print(f"Skipping prompt {i}: {e}")
+                continue
+            pending.append((i, model, key))
+        if not pending:
+            return results
+        
+        texts = self._run_batch(
+            [(prompts[i], model) for i, model, _ in pending],
+            max_tokens, target_lang, system, poll_interval
+        )
+        for (i, _, key), text in zip(pending, texts):
+            if text is not None:
+                self._store_response(key, text)
+                results[i] = text
+        return results
+    
+    def _check_batch_budget(self, batch_requests: List[Tuple[str, str]], system: Optional[str]) -> None:
+        """
+        Make sure a whole batch job fits the budget before submitting it
+        
+        Once submitted every request is billed, so unlike realtime calls the
+        budget can't be checked request by request.
+        
+        Raises:
+            BudgetExceeded: If the spend plus the estimated job cost reaches budget_limit
+        """
+        system_tokens = estimate_tokens(system) if system else 0
+        estimate = 0.0
+        for prompt, model in batch_requests:
+            prompt_tokens = estimate_tokens(prompt)
+            # The reply is about as long as the texts to translate
+            estimate += usage_cost(model, prompt_tokens + system_tokens, prompt_tokens, factor=BATCH_FACTOR)
+        self.cost_tracker.check(estimate)
+    
+    def _run_batch(
+        self,
+        batch_requests: List[Tuple[str, str]],
+        max_tokens: int,
+        target_lang: str,
+        system: Optional[str],
+        poll_interval: float
+    ) -> List[Optional[str]]:
+        """
+        Run (prompt, model) requests as one batch job
+        
+        The default sends them one by one in realtime, providers with a batch API override this
+        
+        Returns:
+            Response texts in request order, None where a request failed
+        """
+        texts = []
+        for prompt, model in batch_requests:
+            try:
+                texts.append(self._call(prompt, max_tokens, target_lang, model, system))
+            except Exception as e:
+                print(f"Request failed: {e}")
+                texts.append(None)
+        return texts
+
+
+# Prompts below both thresholds go to Haiku, anything larger keeps Sonnet
+_SONNET_TEXT_THRESHOLD = 10_000
+_SONNET_ITEM_THRESHOLD = 30
+_HAIKU_MODEL = "claude-haiku-4-5-20251001"
+# Seconds an ephemeral prompt cache entry lives after its last read
+_PROMPT_CACHE_TTL = 300
 
 
 class ClaudeTranslator(LLMTranslator):
     """Claude API implementation of LLM translator"""
     
+    __slots__ = ("force_model", "_uncached_models", "_cache_reads")
+    
+    # Tier 1 limits of the Claude API
+    default_rpm = 50
+    default_tpm = 30_000
+    context_limits = {
+        "claude-sonnet-4-5": 200_000,
+        "claude-haiku-4-5": 200_000,
+        "claude-opus-4-1": 200_000,
+    }
+    # Shortest prompt prefix each model caches, shorter prefixes are billed in full
+    min_cacheable_tokens: Dict[str, int] = {
+        "claude-sonnet-4-5": 1024,
+        "claude-haiku-4-5": 4096,
+        "claude-opus-4-1": 1024,
+    }
+    
+    def __init__(self, api_key: str, base_url: Optional[str] = None, model_id: Optional[str] = None, force_model: Optional[str] = None, **kwargs):
+        """
+        Initialize Claude translator
+        
+        Without model_id or force_model short prompts are routed to Haiku and
+        long ones to Sonnet; either argument pins every request to one model.
+        
+        Args:
+            force_model: Model identifier that overrides routing (optional)
+        """
+        self.force_model = force_model or model_id
+        # Models already reported as getting a system prompt too short to cache
+        self._uncached_models = set()
+        # Model -> time.monotonic() of the last response that read the prompt cache
+        self._cache_reads: Dict[str, float] = {}
+        super().__init__(api_key, base_url=base_url, model_id=self.force_model, **kwargs)
+    
     def get_default_model(self) -> str:
         """Get default Claude model"""
         return "claude-sonnet-4-5-20250929"
     
-    def _setup_client(self) -> anthropic.Anthropic:
+    def select_model(self, prompt: str, item_count: Optional[int] = None, force: Optional[str] = None) -> str:
+        """
+        Pick Haiku or Sonnet by prompt complexity
+        
+        Args:
+            prompt: The full prompt including texts to translate
+            item_count: Number of texts in the prompt (optional, defaults to the prompt's line count)
+            force: Model identifier to use regardless of the prompt (optional)
+            
+        Returns:
+            Model identifier
+        """
+        if force:
+            return force
+        if item_count is None:
+            item_count = prompt.count("\n") + 1
+        if len(prompt) < _SONNET_TEXT_THRESHOLD and item_count < _SONNET_ITEM_THRESHOLD:
+            return _HAIKU_MODEL
+        return self.model_id
+    
+    def model_for(self, prompt: str, item_count: Optional[int] = None, system: Optional[str] = None) -> str:
+        """Route by prompt size unless a model was forced"""
+        if system:
+            prompt = f"{system}\n{prompt}"
+        return self.select_model(prompt, item_count, self.force_model)
+    
+    def models(self) -> List[str]:
+        """The forced model, or Sonnet and Haiku when routing by prompt size"""
+        if self.force_model:
+            return [self.force_model]
+        return [self.model_id, _HAIKU_MODEL]
+    
+    def _limited_tokens(self, prompt: str, model: str, system: Optional[str]) -> int:
+        """
+        Leave out the system prompt while the model recently read it from the prompt cache
+        
+        Anthropic doesn't count cache reads against the input tokens per minute limit,
+        but until a response reports one the system prompt is billed and counted in full
+        """
+        read_at = self._cache_reads.get(model)
+        if read_at is not None and time.monotonic() - read_at < _PROMPT_CACHE_TTL:
+            return estimate_tokens(prompt)
+        return super()._limited_tokens(prompt, model, system)
+    
+    def _build_client(self) -> anthropic.Anthropic:
         """Setup Claude API client"""
-        kwargs = {"api_key": self.api_key}
+        # Retries are handled by LLMTranslator together with the rate limiter
+        kwargs = {
+            "api_key": self.api_key,
+            "max_retries": 0,
+            "http_client": anthropic.DefaultHttpxClient(limits=self._http_limits())
+        }
         if self.base_url:
             kwargs["base_url"] = self.base_url
         return anthropic.Anthropic(**kwargs)
     
-    def translate(self, prompt: str, max_tokens: int = 4000, target_lang: str = 'zh-CN') -> str:
+    def _warm_up(self) -> None:
+        """List one model, the cheapest authenticated request"""
+        self.client.models.list(limit=1)
+    
+    def _setup_async_client(self) -> anthropic.AsyncAnthropic:
+        """Setup async Claude API client"""
+        # Retries are handled by LLMTranslator together with the rate limiter
+        kwargs = {
+            "api_key": self.api_key,
+            "max_retries": 0,
+            "http_client": anthropic.DefaultAsyncHttpxClient(limits=self._http_limits())
+        }
+        if self.base_url:
+            kwargs["base_url"] = self.base_url
+        return anthropic.AsyncAnthropic(**kwargs)
+    
+    async def aclose(self) -> None:
+        """Close the async Claude client"""
+        if self._aclient is not None:
+            aclient, self._aclient = self._aclient, None
+            await aclient.close()
+    
+    def _translate(self, prompt: str, max_tokens: int, target_lang: str, model: str, system: Optional[str]) -> str:
         """
         Translate using Claude API
         
@@ -84,27 +896,145 @@ class ClaudeTranslator(LLMTranslator):
         Returns:
             Translated text response from Claude
         """
-        message = self.client.messages.create(
-            model=self.model_id,
-            max_tokens=max_tokens,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
+        with _anthropic_errors():
+            message = self.client.messages.create(**self._request(prompt, max_tokens, model, system))
+        self._record_message(message)
+        return message.content[0].text
+    
+    async def _atranslate(self, prompt: str, max_tokens: int, target_lang: str, model: str, system: Optional[str]) -> str:
+        """Translate using the async Claude API"""
+        with _anthropic_errors():
+            message = await self._async_client().messages.create(**self._request(prompt, max_tokens, model, system))
+        self._record_message(message)
         return message.content[0].text
     
+    def _stream(self, prompt: str, max_tokens: int, target_lang: str, model: str, system: Optional[str]) -> Iterator[str]:
+        """Stream the reply of the Claude API"""
+        with _anthropic_errors():
+            with self.client.messages.stream(**self._request(prompt, max_tokens, model, system)) as stream:
+                for text in stream.text_stream:
+                    yield text
+                message = stream.get_final_message()
+        self._record_message(message)
+    
+    def _record_message(self, message, factor: float = 1.0) -> None:
+        """Track the cost of a Claude response and report its prompt cache use"""
+        _log_cache_usage(message)
+        usage = message.usage
+        # Batch results arrive long after their cache reads, only realtime ones show a live entry
+        if factor == 1.0 and getattr(usage, "cache_read_input_tokens", None):
+            self._cache_reads[message.model] = time.monotonic()
+        self._record_usage(
+            message.model,
+            usage.input_tokens,
+            usage.output_tokens,
+            getattr(usage, "cache_creation_input_tokens", None) or 0,
+            getattr(usage, "cache_read_input_tokens", None) or 0,
+            factor
+        )
+    
+    def _run_batch(
+        self,
+        batch_requests: List[Tuple[str, str]],
+        max_tokens: int,
+        target_lang: str,
+        system: Optional[str],
+        poll_interval: float
+    ) -> List[Optional[str]]:
+        """Run the requests through the Message Batches API"""
+        self._check_batch_budget(batch_requests, system)
+        batch = self.client.messages.batches.create(requests=[
+            {"custom_id": f"i_{i}", "params": self._request(prompt, max_tokens, model, system)}
+            for i, (prompt, model) in enumerate(batch_requests)
+        ])
+        print(f"Submitted batch {batch.id} with {len(batch_requests)} requests")
+        while batch.processing_status != "ended":
+            time.sleep(poll_interval)
+            batch = self.client.messages.batches.retrieve(batch.id)
+        
+        texts: List[Optional[str]] = [None] * len(batch_requests)
+        for entry in self.client.messages.batches.results(batch.id):
+            if entry.result.type == "succeeded":
+                self._record_message(entry.result.message, BATCH_FACTOR)
+                texts[int(entry.custom_id[2:])] = entry.result.message.content[0].text
+            else:
+                print(f"Batch request {entry.custom_id} {entry.result.type}")
+        return texts
+    
+    def _cacheable(self, system: str, model: str) -> bool:
+        """Whether the system prompt is long enough for the model to cache it"""
+        minimum = _per_model(self.min_cacheable_tokens, model) or 0
+        tokens = estimate_tokens(system)
+        if tokens >= minimum:
+            return True
+        if model not in self._uncached_models:
+            self._uncached_models.add(model)
+            print(f"System prompt of about {tokens} tokens is below the {minimum} token minimum {model} caches, sending it uncached")
+        return False
+    
+    def _request(self, prompt: str, max_tokens: int, model: str, system: Optional[str]) -> dict:
+        """Build the messages request, marking the system prompt as a cacheable prefix when the model would cache it"""
+        kwargs = {
+            "model": model,
+            "max_tokens": max_tokens,
+            "messages": [
+                {"role": "user", "content": [{"type": "text", "text": prompt}]}
+            ]
+        }
+        if system:
+            block = {"type": "text", "text": system}
+            if self._cacheable(system, model):
+                block["cache_control"] = {"type": "ephemeral"}
+            kwargs["system"] = [block]
+        return kwargs
+    
+_DEEPSEEK_URL = "https://api.deepseek.com/chat/completions"
+_QWEN_URL = "https://dashscope.aliyuncs.com/compatible-mode/v1/chat/completions"
+
+
 class DeepseekTranslator(LLMTranslator):
     """Deepseek API implementation of LLM translator"""
 
+    __slots__ = ()
+    # Sampled at temperature 1.3, so repeated prompts are not cached by default
+    deterministic = False
+    context_limits = {
+        "deepseek-chat": 128_000,
+        "deepseek-reasoner": 128_000,
+    }
+
     def get_default_model(self) -> str:
         """Get default Deepseek model"""
         return "deepseek-chat"
 
-    def _setup_client(self):
+    def _build_client(self) -> httpx.Client:
         """Setup Deepseek API client"""
-        pass
+        return httpx.Client(**_http_options(self.api_key, self._http_limits()))
+
+    def _warm_up(self) -> None:
+        """HEAD the endpoint, the status is irrelevant"""
+        self.client.head(self.base_url or _DEEPSEEK_URL)
+
+    def _setup_async_client(self) -> httpx.AsyncClient:
+        """Setup async Deepseek API client"""
+        return httpx.AsyncClient(**_http_options(self.api_key, self._http_limits()))
+
+    def _request(self, prompt: str, model: str, system: Optional[str]) -> dict:
+        """Build the chat completion request"""
+        messages = [{"role": "user", "content": prompt}]
+        if system:
+            # Deepseek caches repeated message prefixes on its own
+            messages.insert(0, {"role": "system", "content": system})
+        return {
+            "url": self.base_url or _DEEPSEEK_URL,
+            "json": {
+                "model": model,
+                "temperature": 1.3,
+                "messages": messages
+            }
+        }
     
-    def translate(self, prompt: str, max_tokens: int = 4000, target_lang: str = 'zh-CN') -> str:
+    def _translate(self, prompt: str, max_tokens: int, target_lang: str, model: str, system: Optional[str]) -> str:
         """
         Translate using Claude API
         
@@ -115,49 +1045,57 @@ class DeepseekTranslator(LLMTranslator):
         Returns:
             Translated text response from Claude
         """
-        res = requests.post(
-            url=self.base_url or "https://api.deepseek.com/chat/completions",
-            json={
-                "model": self.model_id,
-                "temperature": 1.3,
-                "messages": [
-                    {"role": "user", "content": prompt}
-                ]
-            },
-            headers={
-                "Authorization": f"Bearer {self.api_key}"
-            }
-        )
-        if not (res.status_code >= 200 and res.status_code < 300):
-            raise ValueError(f"API error: {res.status_code} {res.text}")
-        return res.json()["choices"][0]["message"]["content"]
+        res = self.client.post(**_encode_request(self._request(prompt, model, system)))
+        text, usage = _chat_content(res)
+        self._record_chat_usage(model, usage)
+        return text
+
+    async def _atranslate(self, prompt: str, max_tokens: int, target_lang: str, model: str, system: Optional[str]) -> str:
+        """Translate using the Deepseek API without blocking the event loop"""
+        res = await self._async_client().post(**_encode_request(self._request(prompt, model, system)))
+        text, usage = _chat_content(res)
+        self._record_chat_usage(model, usage)
+        return text
+
+    def _stream(self, prompt: str, max_tokens: int, target_lang: str, model: str, system: Optional[str]) -> Iterator[str]:
+        """Stream the reply of the Deepseek API"""
+        usage = yield from _stream_chat(self.client, self._request(prompt, model, system))
+        self._record_chat_usage(model, usage)
 
 class QWenTranslator(LLMTranslator):
     """Qwen API implementation of LLM translator"""
 
+    __slots__ = ()
+    context_limits = {
+        "qwen-mt-turbo": 16_384,
+        "qwen-mt-plus": 16_384,
+    }
+
     def get_default_model(self) -> str:
         """Get default Qwen model"""
         return "qwen-mt-turbo"
 
-    def _setup_client(self):
+    def _build_client(self) -> httpx.Client:
         """Setup Qwen API client"""
-        pass
+        return httpx.Client(**_http_options(self.api_key, self._http_limits()))
 
-    def translate(self, prompt: str, max_tokens: int = 4000, target_lang: str = 'zh-CN') -> str:
-        """
-        Translate using Qwen API
-        
-        Args:
-            prompt: The full prompt including texts to translate
-            max_tokens: Maximum tokens for the response
-            
-        Returns:
-            Translated text response from Qwen
-        """
-        res = requests.post(
-            url=self.base_url or "https://dashscope.aliyuncs.com/compatible-mode/v1/chat/completions",
-            json={
-                "model": self.model_id,
+    def _warm_up(self) -> None:
+        """HEAD the endpoint, the status is irrelevant"""
+        self.client.head(self.base_url or _QWEN_URL)
+
+    def _setup_async_client(self) -> httpx.AsyncClient:
+        """Setup async Qwen API client"""
+        return httpx.AsyncClient(**_http_options(self.api_key, self._http_limits()))
+
+    def _request(self, prompt: str, target_lang: str, model: str, system: Optional[str]) -> dict:
+        """Build the chat completion request"""
+        if system:
+            # Qwen-MT only accepts a single user message
+            prompt = f"{system}\n{prompt}"
+        return {
+            "url": self.base_url or _QWEN_URL,
+            "json": {
+                "model": model,
                 "messages": [
                     {"role": "user", "content": prompt}
                 ],
@@ -167,29 +1105,290 @@ class QWenTranslator(LLMTranslator):
                         "target_lang": target_lang[:2].lower() # zh
                     }
                 }
-            },
-            headers={
-                "Authorization": f"Bearer {self.api_key}"
             }
+        }
+
+    def _translate(self, prompt: str, max_tokens: int, target_lang: str, model: str, system: Optional[str]) -> str:
+        """
+        Translate using Qwen API
+        
+        Args:
+            prompt: The full prompt including texts to translate
+            max_tokens: Maximum tokens for the response
+            
+        Returns:
+            Translated text response from Qwen
+        """
+        res = self.client.post(**_encode_request(self._request(prompt, target_lang, model, system)))
+        text, usage = _chat_content(res)
+        self._record_chat_usage(model, usage)
+        return text
+
+    async def _atranslate(self, prompt: str, max_tokens: int, target_lang: str, model: str, system: Optional[str]) -> str:
+        """Translate using the Qwen API without blocking the event loop"""
+        res = await self._async_client().post(**_encode_request(self._request(prompt, target_lang, model, system)))
+        text, usage = _chat_content(res)
+        self._record_chat_usage(model, usage)
+        return text
+
+    def _stream(self, prompt: str, max_tokens: int, target_lang: str, model: str, system: Optional[str]) -> Iterator[str]:
+        """Stream the reply of the Qwen API"""
+        usage = yield from _stream_chat(self.client, self._request(prompt, target_lang, model, system))
+        self._record_chat_usage(model, usage)
+
+    def _run_batch(
+        self,
+        batch_requests: List[Tuple[str, str]],
+        max_tokens: int,
+        target_lang: str,
+        system: Optional[str],
+        poll_interval: float
+    ) -> List[Optional[str]]:
+        """Run the requests through the OpenAI compatible /files and /batches endpoints"""
+        self._check_batch_budget(batch_requests, system)
+        chat_url = self.base_url or _QWEN_URL
+        api_root = chat_url.rsplit("/chat/completions", 1)[0]
+        lines = []
+        for i, (prompt, model) in enumerate(batch_requests):
+            body = self._request(prompt, target_lang, model, system)["json"]
+            lines.append(json.dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": body
+            }, ensure_ascii=False))
+        
+        res = self.client.post(
+            f"{api_root}/files",
+            files={"file": ("batch.jsonl", "\n".join(lines).encode("utf-8"))},
+            data={"purpose": "batch"}
         )
+        file_id = _json_response(res)["id"]
+        res = self.client.post(f"{api_root}/batches", json={
+            "input_file_id": file_id,
+            "endpoint": "/v1/chat/completions",
+            "completion_window": "24h"
+        })
+        batch = _json_response(res)
+        print(f"Submitted batch {batch['id']} with {len(batch_requests)} requests")
+        while batch["status"] not in ("completed", "failed", "expired", "cancelled"):
+            time.sleep(poll_interval)
+            batch = _json_response(self.client.get(f"{api_root}/batches/{batch['id']}"))
+        
+        texts: List[Optional[str]] = [None] * len(batch_requests)
+        batch_models = [model for _, model in batch_requests]
+        if not batch.get("output_file_id"):
+            print(f"Batch {batch['id']} {batch['status']} without output")
+            return texts
+        res = self.client.get(f"{api_root}/files/{batch['output_file_id']}/content")
+        _raise_for_status(res)
+        for line in res.text.splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            response = entry.get("response") or {}
+            if response.get("status_code") == 200:
+                self._record_chat_usage(batch_models[int(entry["custom_id"])], response["body"].get("usage"), BATCH_FACTOR)
+                texts[int(entry["custom_id"])] = response["body"]["choices"][0]["message"]["content"]
+            else:
+                print(f"Batch request {entry['custom_id']} failed: {entry.get('error') or response}")
+        return texts
+
+def _per_model(table: Dict[str, int], model: str) -> Optional[int]:
+    """Look a model up in a per-model table, dated ids match their undated entry"""
+    value = table.get(model)
+    if value is None:
+        matches = [name for name in table if model.startswith(name)]
+        if matches:
+            value = table[max(matches, key=len)]
+    return value
+
+def _http_options(api_key: str, limits: httpx.Limits) -> dict:
+    """
+    httpx.Client / httpx.AsyncClient options for an OpenAI compatible endpoint
+    
+    One pooled client keeps connections open across calls instead of handshaking
+    again for every request. With the optional h2 package installed, concurrent
+    requests are multiplexed as HTTP/2 streams over a single connection.
+    Content-Type is left to httpx, which picks it per request (JSON or multipart).
+    """
+    return {
+        "http2": h2 is not None,
+        "timeout": httpx.Timeout(120.0, connect=10.0),
+        "limits": limits,
+        "headers": {"Authorization": f"Bearer {api_key}"}
+    }
+
+def _parse_items(response: str, count: int) -> List[str]:
+    """
+    Parse the JSON object a translate_items pack was answered with
+    
+    Raises:
+        ValueError: If the reply is not a JSON object holding keys 1..count
+    """
+    # remove markdown code block if exists
+    if response.startswith("```") and response.endswith("```"):
+        response = "\n".join(response.split("\n")[1:-1])
+    translated = json.loads(response)
+    if not isinstance(translated, dict):
+        raise ValueError("reply is not a JSON object")
+    try:
+        return [str(translated[str(i)]) for i in range(1, count + 1)]
+    except KeyError as e:
+        raise ValueError(f"reply is missing item {e}") from None
+
+def _encode_request(request: dict) -> dict:
+    """
+    Turn a {"url", "json"} request into client.post() arguments
+    
+    The body is serialized with src.jsonio (orjson when installed) instead of
+    letting httpx run the stdlib encoder over it.
+    """
+    return {
+        "url": request["url"],
+        "content": jsonio.dumps(request["json"]),
+        "headers": {"Content-Type": "application/json"}
+    }
+
+def _prompt_hash(prompt: str, target_lang: str, system: Optional[str]) -> str:
+    """Identify a prompt in a translate_many checkpoint file"""
+    return hashlib.sha256(f"{target_lang}\0{system or ''}\0{prompt}".encode("utf-8")).hexdigest()
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """
+    Exponential backoff with up to a second of jitter, or the server's Retry-After
+    when it asks for longer
+    
+    The jitter keeps concurrent requests that failed together from retrying in lockstep
+    """
+    delay = min(_BACKOFF_MAX, _BACKOFF_BASE * 2 ** (attempt - 1) + random.uniform(0, 1))
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, _BACKOFF_MAX))
+    return delay
+
+def _retry_wait(error: Exception, attempt: int) -> float:
+    """Announce the retry of a failed attempt and return how long to wait before it"""
+    delay = _retry_delay(error, attempt)
+    print(f"Request failed ({error}), retrying in {delay:.1f}s ({attempt}/{_MAX_ATTEMPTS - 1})")
+    return delay
+
+def _raise_for_status(res) -> None:
+    """
+    Raises:
+        TransientError: If the API is throttling, overloaded or timed out
+        PermanentError: If the API returned any other non 2xx status
+    """
+    if not (res.status_code >= 200 and res.status_code < 300):
+        raise status_error(res.status_code, f"API error: {res.status_code} {res.text}", parse_retry_after(res.headers))
+
+@contextmanager
+def _anthropic_errors():
+    """Translate Anthropic SDK errors into TransientError / PermanentError"""
+    try:
+        yield
+    except anthropic.APIStatusError as e:
+        raise status_error(e.status_code, str(e), parse_retry_after(e.response.headers)) from e
+    except anthropic.APIConnectionError as e:
+        raise TransientError(str(e)) from e
+
+def _chat_content(res) -> Tuple[str, dict]:
+    """
+    Extract the reply of an OpenAI compatible chat completion response
+    
+    Works for both httpx.Client and httpx.AsyncClient responses
+    
+    Returns:
+        The reply text and the usage field ({} if missing)
+    
+    Raises:
+        TransientError: If the API is throttling, overloaded or timed out
+        PermanentError: If the API returned any other non 2xx status
+    """
+    _raise_for_status(res)
+    data = jsonio.loads(res.content)
+    return data["choices"][0]["message"]["content"], data.get("usage") or {}
+
+def _stream_chat(client: httpx.Client, request: dict) -> Generator[str, None, dict]:
+    """
+    Send an OpenAI compatible chat completion request with "stream": true
+    
+    Yields:
+        The content deltas of the server-sent events
+        
+    Returns:
+        The usage field of the final event ({} if missing)
+    """
+    body = {**request["json"], "stream": True, "stream_options": {"include_usage": True}}
+    usage = {}
+    with client.stream("POST", **_encode_request({"url": request["url"], "json": body})) as res:
         if not (res.status_code >= 200 and res.status_code < 300):
-            raise ValueError(f"API error: {res.status_code} {res.text}")
-        return res.json()["choices"][0]["message"]["content"]
+            res.read()
+            _raise_for_status(res)
+        for line in res.iter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            event = jsonio.loads(data)
+            usage = event.get("usage") or usage
+            for choice in event.get("choices") or []:
+                content = (choice.get("delta") or {}).get("content")
+                if content:
+                    yield content
+    return usage
+
+def _json_response(res) -> dict:
+    """
+    Decode a JSON API response
+    
+    Raises:
+        TransientError: If the API is throttling, overloaded or timed out
+        PermanentError: If the API returned any other non 2xx status
+    """
+    _raise_for_status(res)
+    return jsonio.loads(res.content)
+
+def _log_cache_usage(message) -> None:
+    """Report prompt cache reads and writes of a Claude response"""
+    read = getattr(message.usage, "cache_read_input_tokens", None) or 0
+    created = getattr(message.usage, "cache_creation_input_tokens", None) or 0
+    if read or created:
+        print(f"Prompt cache: {read} tokens read, {created} tokens written")
+
+# Provider name -> translator class, extended through LLMTranslator.register()
+_REGISTRY: Dict[str, Type[LLMTranslator]] = {
+    "claude": ClaudeTranslator,
+    "deepseek": DeepseekTranslator,
+    "qwen": QWenTranslator,
+}
 
 def create_translator(
     provider: str,
     api_key: str,
     base_url: Optional[str] = None,
-    model_id: Optional[str] = None
+    model_id: Optional[str] = None,
+    force_model: Optional[str] = None,
+    budget_limit: Optional[float] = None,
+    rpm: Optional[int] = None,
+    tpm: Optional[int] = None,
+    cache_enabled: Optional[bool] = None
 ) -> LLMTranslator:
     """
     Factory function to create a translator instance
     
     Args:
-        provider: Provider name ('claude', etc.)
+        provider: Provider name ('claude', 'deepseek', 'qwen' or a registered one)
         api_key: API key for the service
         base_url: Base URL for the API endpoint (optional)
         model_id: Model identifier to use (optional)
+        force_model: Model identifier that overrides prompt-size routing (optional)
+        budget_limit: Stop sending requests once this many USD were spent (optional)
+        rpm: Requests per minute allowed (optional, defaults to the provider limit, 0 disables it)
+        tpm: Input tokens per minute allowed (optional, defaults to the provider limit, 0 disables it)
+        cache_enabled: Reuse cached responses and translations (optional, defaults to
+            on for deterministic providers)
         
     Returns:
         Configured translator instance
@@ -197,13 +1396,9 @@ def create_translator(
     Raises:
         ValueError: If provider is not supported
     """
-    provider = provider.lower()
-    
-    if provider == "claude":
-        return ClaudeTranslator(api_key=api_key, base_url=base_url, model_id=model_id)
-    elif provider == "deepseek":
-        return DeepseekTranslator(api_key=api_key, base_url=base_url, model_id=model_id)
-    elif provider == "qwen":
-        return QWenTranslator(api_key=api_key, base_url=base_url, model_id=model_id)
-    else:
-        raise ValueError(f"Unsupported provider: {provider}. Currently only 'claude', 'deepseek', and 'qwen' are supported.")
+    translator_class = _REGISTRY.get(provider.lower())
+    if translator_class is None:
+        supported = ", ".join(f"'{name}'" for name in sorted(_REGISTRY))
+        raise ValueError(f"Unsupported provider: {provider}. Supported providers are {supported}.")
+    # force_model pins the model just like model_id, Claude additionally skips its routing
+    return translator_class(api_key=api_key, base_url=base_url, model_id=force_model or model_id, budget_limit=budget_limit, rpm=rpm, tpm=tpm, cache_enabled=cache_enabled)